@@ -1,11 +1,48 @@
-import json
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator
 
 import requests
-from .session import Requestor
+from .batch import BatchBuilder, BatchOperation, BatchResult, BulkReport, batch_unavailable
+from .checkpoint import FileCheckpoint, SQLiteCheckpoint
+from .query import Query
+from .relationships import PRODUCT_RELATIONSHIPS, RelationshipFetcher
+from .session import Page, Requestor, add_params
+from .uploads import MultipartStream, UploadReport, image_mime, upload_directory
 from .MsExceptions import MsExceptions
 
 
+def _resource_type(endpoint: str) -> str:
+    """
+    Returns the JSON:API type served by an endpoint, e.g. "categories" for products/1/categories
+    """
+    return endpoint.split("?")[0].rstrip("/").split("/")[-1]
+
+
+class LazyResource:
+
+    """
+    Creates a resource client the first time it is accessed on a Client and caches it on the instance.
+    The resource shares the Requestor of the Client it belongs to.
+    """
+
+    def __init__(self, resource: type):
+        self.resource = resource
+        self.name = None
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+
+        client = self.resource(instance._r.session, instance.store, requestor=instance._r)
+        instance.__dict__[self.name] = client
+        return client
+
+
 class BaseClient:
     endpoint = None
     vnd = True
@@ -17,16 +54,65 @@ class BaseClient:
         "delete": False,
     }
 
-    def __init__(self, session: requests.Session, store: str):
-        self._r = Requestor(session, store)
+    def __init__(self, session: requests.Session, store: str, requestor: Requestor | None = None):
+        self._r = requestor if requestor is not None else Requestor(session, store)
+
+    @staticmethod
+    def _read_params(
+            resource_type: str,
+            only_id: bool = False,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ) -> dict:
 
-    def all_items(self, endpoint: str, only_id: bool = False):
-        all_items = self._r.get_paginated(endpoint)
+        """
+        Builds JSON:API filter, sort, page size, sparse fieldset and include parameters.
+        :param resource_type: Type the fields apply to when fields is not a dict
+        :param only_id: Request no attributes of resource_type, only identifiers
+        :param fields: Fields per type, e.g. {"products": ["name", "sku"]}, or a list of fields of resource_type
+        :param include: Relationships to include, e.g. ["categories", "product-variants"]
+        :param query: Filters, sort and page size, fields and include given as arguments take precedence over its own
+        """
+
+        params = dict() if query is None else query.params()
+
+        if fields is not None and not isinstance(fields, dict):
+            fields = {resource_type: fields}
+
+        for fields_type, type_fields in (fields or {}).items():
+            params[f"fields[{fields_type}]"] = type_fields if isinstance(type_fields, str) else ",".join(type_fields)
 
         if only_id:
-            return [item['id'] for item in all_items]
+            params[f"fields[{resource_type}]"] = ""
+
+        if include:
+            params["include"] = include if isinstance(include, str) else ",".join(include)
 
-        return all_items
+        return params
+
+    def iter_items(
+            self,
+            endpoint: str,
+            only_id: bool = False,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            checkpoint: FileCheckpoint | SQLiteCheckpoint | None = None,
+            query: Query | None = None
+    ) -> Iterator:
+        params = self._read_params(_resource_type(endpoint), only_id, fields, include, query)
+        for item in self._r.iter_paginated(endpoint, params, checkpoint):
+            yield item['id'] if only_id else item
+
+    def all_items(
+            self,
+            endpoint: str,
+            only_id: bool = False,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ):
+        return list(self.iter_items(endpoint, only_id, fields, include, query=query))
 
     def _validate_call(self, permission: str):
         if self.endpoint is None:
@@ -34,27 +120,91 @@ class BaseClient:
         if not self.permissions[permission]:
             raise MsExceptions.EndpointPermissionError("Subclass does not have permission to use this method")
 
-    def all(self, only_id: bool = False, endpoint: str | None = None) -> list:
+    def iter_pages(
+            self,
+            endpoint: str | None = None,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            checkpoint: FileCheckpoint | SQLiteCheckpoint | None = None,
+            query: Query | None = None
+    ) -> Iterator[Page]:
+
+        """
+        Yields one page at a time, with the page's links, meta (e.g. meta total) and included resources
+        alongside the data.
+        """
+
+        self._validate_call("all")
+        endpoint = self.endpoint if endpoint is None else endpoint
+        params = self._read_params(_resource_type(endpoint), False, fields, include, query)
+        return self._r.iter_pages(endpoint, params, checkpoint)
+
+    def iter_all(
+            self,
+            only_id: bool = False,
+            endpoint: str | None = None,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            checkpoint: FileCheckpoint | SQLiteCheckpoint | None = None,
+            query: Query | None = None
+    ) -> Iterator:
+
+        """
+        Lazy version of all(), holding at most one page of resources in memory.
+        With a checkpoint, an interrupted crawl resumes at the page after the last one fully consumed.
+        """
 
         self._validate_call("all")
-        all_items = self._r.get_paginated(self.endpoint if endpoint is None else endpoint)
+        endpoint = self.endpoint if endpoint is None else endpoint
+        return self.iter_items(endpoint, only_id, fields, include, checkpoint, query)
 
-        return [item['id'] for item in all_items] if only_id else all_items
+    def all(
+            self,
+            only_id: bool = False,
+            endpoint: str | None = None,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ) -> list:
+        return list(self.iter_all(only_id, endpoint, fields, include, query=query))
+
+    def get_document(
+            self,
+            item_id: int | str | None,
+            endpoint: str | None = None,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ) -> dict:
 
-    def get(self, item_id: int | str | None, endpoint: str | None = None):
+        """
+        Same as get(), but returns the whole response document, with included resources.
+        """
 
         if item_id is None and endpoint is None:
             raise MsExceptions.MissingID("Call has no item_id")
 
         self._validate_call("get")
-        return self._r.get(f"{self.endpoint}/{item_id}" if endpoint is None else endpoint, vnd=self.vnd).json()['data']
+        path = f"{self.endpoint}/{item_id}" if endpoint is None else endpoint
+        params = self._read_params(self.endpoint, False, fields, include, query)
+        return self._r.get_json(add_params(path, params), vnd=self.vnd)
 
-    def create(self, data: str | dict, endpoint: str | None = None):
+    def get(
+            self,
+            item_id: int | str | None,
+            endpoint: str | None = None,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ):
+        return self.get_document(item_id, endpoint, fields, include, query)['data']
+
+    def create(self, data: str | bytes | dict, endpoint: str | None = None):
 
         self._validate_call("create")
         return self._r.post(self.endpoint if endpoint is None else endpoint, data, vnd=self.vnd)
 
-    def update(self, item_id: str | int, data: str | dict):
+    def update(self, item_id: str | int, data: str | bytes | dict):
 
         self._validate_call("update")
         return self._r.patch(f"{self.endpoint}/{item_id}", data, vnd=self.vnd)
@@ -66,57 +216,88 @@ class BaseClient:
     
     def get_singleton(self, endpoint : str | None = None):
         self._validate_call("all")
-        return self._r.get(f"{self.endpoint}" if endpoint is None else endpoint, vnd=self.vnd).json()
+        return self._r.get_json(f"{self.endpoint}" if endpoint is None else endpoint, vnd=self.vnd)
 
+    # Bulk
 
-class Client(BaseClient):
-    def __init__(self, session: requests.Session, store: str):
-        super().__init__(session, store)
-        self.batch = Batch(session, store)
-        self.products = Products(session, store)
-        self.categories = Categories(session, store)
-        self.customers = Customers(session, store)
-        self.customer_groups = CustomerGroups(session, store)
-        self.customer_login_tokens = CustomerLoginTokens(session, store)
-        self.images = Images(session, store)
-        self.product_attributes = ProductAttributes(session, store)
-        self.product_variants = ProductVariants(session, store)
-        self.product_specials = ProductSpecials(session, store)
-        self.product_reviews = ProductReviews(session, store)
-        self.product_options = ProductOptions(session, store)
-        self.product_suboptions = ProductSuboptions(session, store)
-        self.product_option_values = ProductOptionValues(session, store)
-        self.product_properties = ProductProperties(session, store)
-        self.product_property_options = ProductPropertyOptions(session, store)
-        self.product_property_values = ProductPropertyValues(session, store)
-        self.product_tags = ProductTags(session, store)
-        self.product_customer_group_prices = ProductCustomerGroupPrices(session, store)
-        self.product_attribute_customer_group_prices = ProductAttributeCustomerGroupPrices(session, store)
-        self.orders = Orders(session, store)
-        self.order_products = OrderProducts(session, store)
-        self.order_product_attributes = OrderProductAttributes(session, store)
-        self.order_status = OrderStatus(session, store)
-        self.order_status_history = OrderStatusHistory(session, store)
-        self.order_tags = OrderTags(session, store)
-        self.order_totals = OrderTotals(session, store)
-        self.manufacturers = Manufacturers(session, store)
-        self.suppliers = Suppliers(session, store)
-        self.discounts = Discounts(session, store)
-        self.tax_classes = TaxClasses(session, store)
-        self.visitors = Visitors(session, store)
-        self.redirects = Redirects(session, store)
-        self.settings = Settings(session, store)
-        self.shipping = Shipping(session, store)
-        self.payment = Payment(session, store)
-        self.currencies = Currencies(session, store)
-        self.languages = Languages(session, store)
-        self.product_tabs = ProductTabs(session, store)
-        self.campaigns = Campaigns(session, store)
-        self.campaign_products = CampaignProducts(session, store)
-        self.stock_groups = StockGroups(session, store)
-        self.stock_group_rules = StockGroupRules(session, store)
-        self.product_tab_descriptions = ProductTabDescriptions(session, store)
-        self.product_sets = ProductSets(session, store)
+    def create_many(self, items: Iterable[str | dict], use_batch: bool = True, max_workers: int = 4) -> BulkReport:
+
+        """
+        Creates every item, through the non-atomic batch endpoint or, with use_batch=False, a thread pool.
+        Operations in a batch request refused with one of batch.BATCH_UNAVAILABLE are sent through the thread pool.
+        Failures do not stop the other items.
+        :return: One BatchResult per item, keyed by its position in items
+        """
+
+        self._validate_call("create")
+        builder = self._bulk_builder(max_workers)
+        for data in items:
+            builder.create(self, data)
+        return self._send_bulk(builder, use_batch, max_workers)
+
+    def update_many(
+            self,
+            items: dict | Iterable[tuple[str | int, str | dict]],
+            use_batch: bool = True,
+            max_workers: int = 4
+    ) -> BulkReport:
+
+        """
+        :param items: Mapping or pairs of item_id and data
+        :return: One BatchResult per item, keyed by item_id
+        """
+
+        self._validate_call("update")
+        builder = self._bulk_builder(max_workers)
+        for item_id, data in (items.items() if isinstance(items, dict) else items):
+            builder.update(self, item_id, data, key=item_id)
+        return self._send_bulk(builder, use_batch, max_workers)
+
+    def delete_many(self, item_ids: Iterable[str | int], use_batch: bool = True, max_workers: int = 4) -> BulkReport:
+
+        """
+        :return: One BatchResult per item, keyed by item_id
+        """
+
+        self._validate_call("delete")
+        builder = self._bulk_builder(max_workers)
+        for item_id in item_ids:
+            builder.delete(self, item_id, key=item_id)
+        return self._send_bulk(builder, use_batch, max_workers)
+
+    def _bulk_builder(self, max_workers: int) -> BatchBuilder:
+        return BatchBuilder(Batch(self._r.session, None, requestor=self._r), max_workers=max_workers)
+
+    def _send_bulk(self, builder: BatchBuilder, use_batch: bool, max_workers: int) -> BulkReport:
+        if not use_batch:
+            return BulkReport(self._send_operations(builder.operations, max_workers))
+
+        results = builder.send()
+        unavailable = [i for i, result in enumerate(results) if batch_unavailable(result)]
+        if unavailable:
+            logging.debug(f"Batch endpoint unavailable, sending {len(unavailable)} operations one by one")
+            retried = self._send_operations([results[i].operation for i in unavailable], max_workers)
+            for i, result in zip(unavailable, retried):
+                results[i] = result
+
+        return BulkReport(results)
+
+    def _send_operations(self, operations: list[BatchOperation], max_workers: int) -> list[BatchResult]:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(self._send_operation, operations))
+
+    def _send_operation(self, operation: BatchOperation) -> BatchResult:
+        try:
+            response = self._r._request(operation.method, operation.path, vnd=self.vnd, data=operation.body)
+        except MsExceptions.ApiError as e:
+            return BatchResult(operation, getattr(e, "status_code", None), None, e)
+
+        try:
+            body = self._r.decode(response)
+        except ValueError:
+            body = None
+
+        return BatchResult(operation, response.status_code, body)
 
 
 class Batch(BaseClient):
@@ -130,12 +311,20 @@ class Batch(BaseClient):
         "delete": False,
     }
 
-    def non_atomic(self, data: str):
+    def non_atomic(self, data: str | bytes | dict):
         return self.create(data=data, endpoint="non-atomic-batch")
 
-    def atomic(self, data: str):
+    def atomic(self, data: str | bytes | dict):
         return self.create(data=data)
 
+    def builder(self, max_operations: int = 100, max_bytes: int = 1_000_000, max_workers: int = 4) -> BatchBuilder:
+
+        """
+        Returns a BatchBuilder that collects operations and sends them through this client in sized chunks.
+        """
+
+        return BatchBuilder(self, max_operations, max_bytes, max_workers)
+
 
 class Products(BaseClient):
 
@@ -154,7 +343,14 @@ class Products(BaseClient):
 
     # Relationships
 
-    def categories(self, product_id: int, only_id: bool = False) -> list:
+    def categories(
+            self,
+            product_id: int,
+            only_id: bool = False,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ) -> list:
 
         """
         Returns all categories that product is in.
@@ -163,30 +359,78 @@ class Products(BaseClient):
         :return: All categories connected to the product, as list.
         """
 
-        return self.all_items(f"products/{product_id}/categories", only_id)
-
-    def product_attributes(self, product_id: int) -> list:
-        return self.all_items(f"products/{product_id}/product-attributes")
+        return self.all_items(f"products/{product_id}/categories", only_id, fields, include, query)
 
-    def product_variants(self, product_id: int) -> list:
-        return self.all_items(f"products/{product_id}/product-variants")
-
-    def product_specials(self, product_id: int) -> list:
-        return self.all_items(f"products/{product_id}/product-specials")
+    def product_attributes(
+            self,
+            product_id: int,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ) -> list:
+        return self.all_items(f"products/{product_id}/product-attributes", False, fields, include, query)
+
+    def product_variants(
+            self,
+            product_id: int,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ) -> list:
+        return self.all_items(f"products/{product_id}/product-variants", False, fields, include, query)
+
+    def product_specials(
+            self,
+            product_id: int,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ) -> list:
+        return self.all_items(f"products/{product_id}/product-specials", False, fields, include, query)
+
+    def product_properties(
+            self,
+            product_id: int,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ) -> list:
+        return self.all_items(f"products/{product_id}/product-properties", False, fields, include, query)
+
+    def product_tags(
+            self,
+            product_id: int | str,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ) -> list:
+        return self.all_items(f"products/{product_id}/product-tags", False, fields, include, query)
+
+    def related(
+            self,
+            product_ids: Iterable[int | str],
+            relationships: Iterable[str] = PRODUCT_RELATIONSHIPS,
+            use_include: bool = True,
+            max_workers: int = 8
+    ) -> dict[str, dict[str, list]]:
 
-    def product_properties(self, product_id: int) -> list:
-        return self.all_items(f"products/{product_id}/product-properties")
+        """
+        Returns related resources for many products at once, instead of one crawl per product and relationship.
+        :param product_ids: ID's of products
+        :param relationships: Relationship endpoints, e.g. "categories" or "product-variants"
+        :return: Product ID mapped to relationship mapped to the related resources, as list.
+        """
 
-    def product_tags(self, product_id: int | str) -> list:
-        return self.all_items(f"products/{product_id}/product-tags")
+        self._validate_call("get")
+        return RelationshipFetcher(self, relationships, use_include, max_workers).fetch(product_ids)
 
     def relationships_categories(self, product_id: int) -> tuple:
-        response = self._r.get(f"products/{product_id}/relationships/categories").json()
+        response = self._r.get_json(f"products/{product_id}/relationships/categories")
         return tuple(int(item['id']) for item in response['data'])
 
     def update_relationships_categories(self, product_id: int, categories: tuple | list) -> int:
         data = {'data': [{'id': category, 'type': 'categories'} for category in categories]}
-        return self._r.patch(f"products/{product_id}/relationships/categories", json.dumps(data)).status_code
+        return self._r.patch(f"products/{product_id}/relationships/categories", data).status_code
 
 
 class Categories(BaseClient):
@@ -200,12 +444,19 @@ class Categories(BaseClient):
     }
 
     # Relationships
-    def products(self, category_id: int | str, only_id: bool = False):
-        return self.all_items(f"categories/{category_id}/products", only_id)
+    def products(
+            self,
+            category_id: int | str,
+            only_id: bool = False,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ):
+        return self.all_items(f"categories/{category_id}/products", only_id, fields, include, query)
 
     def update_relationships_products(self, category_id: int, products: tuple | list) -> int:
         data = {'data': [{'id': product, 'type': 'products'} for product in products]}
-        return self._r.patch(f"products/{category_id}/relationships/products", str(data).replace("'", '"')).status_code
+        return self._r.patch(f"products/{category_id}/relationships/products", data).status_code
 
 
 class Customers(BaseClient):
@@ -227,11 +478,23 @@ class Customers(BaseClient):
     }
 
     # Relationships
-    def product_reviews(self, customer_id: int | str):
-        return self.all_items(f"customers/{customer_id}/product-reviews")
+    def product_reviews(
+            self,
+            customer_id: int | str,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ):
+        return self.all_items(f"customers/{customer_id}/product-reviews", False, fields, include, query)
 
-    def orders(self, customer_id: int | str):
-        return self.all_items(f"customers/{customer_id}/orders", False)
+    def orders(
+            self,
+            customer_id: int | str,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ):
+        return self.all_items(f"customers/{customer_id}/orders", False, fields, include, query)
 
 
 class CustomerGroups(BaseClient):
@@ -269,28 +532,33 @@ class Images(BaseClient):
 
     def upload_image(self, path: str, file_path: str):
 
-        body = (
-            "-----BOUNDARY\r\n"
-            "Content-Disposition: form-data; name=\"image\"; filename=\"image.jpeg\"\r\n"
-            "Content-Type: image/jpeg\r\n"
-            "\r\n"
-            "-----BOUNDARY\r\n"
-        )
+        """
+        Uploads one image as multipart/form-data, streaming the file from disk.
+        :param path: Endpoint to post the image to
+        :param file_path: Path of a jpg, jpeg, gif, png or webp file
+        """
 
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
 
-        file_type = file_path.split('.')[-1]
+        with MultipartStream("image", file_path, image_mime(file_path)) as body:
+            return self._r._request('POST', path, vnd=False, data=body, content_type=body.content_type)
 
-        if file_type not in ('jpg', 'jpeg', 'gif', 'png', 'webp'):
-            raise FileNotFoundError(f"File not an image file, filetype: {file_type}")
+    def upload_directory(
+            self,
+            directory: str,
+            path: str = "images",
+            manifest_path: str | None = None,
+            max_workers: int = 4,
+            recursive: bool = False
+    ) -> UploadReport:
 
-        with open(file_path, 'rb') as file:
-            files = {
-                'image': (os.path.basename(file_path), file, f"image/{file_type}")  # Adjust content type accordingly
-            }
+        """
+        Uploads all images in directory concurrently. With manifest_path, files whose content was uploaded
+        before are skipped. The report lists uploaded, skipped and failed files and the throughput.
+        """
 
-            return Requestor._request('POST', path, vnd=False, data=body, content_type=None, files=files)
+        return upload_directory(self, directory, path, manifest_path, max_workers, recursive)
 
 
 class ProductAttributes(BaseClient):
@@ -348,11 +616,27 @@ class ProductOptions(BaseClient):
     }
 
     # TODO: Add relationships for product-options
-    def all_suboptions(self, product_option_id: str | int, only_id: bool = False):
-        return self.all_items(f"product-options/{product_option_id}/product-suboptions", only_id)
+    def all_suboptions(
+            self,
+            product_option_id: str | int,
+            only_id: bool = False,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ):
+        endpoint = f"product-options/{product_option_id}/product-suboptions"
+        return self.all_items(endpoint, only_id, fields, include, query)
 
-    def all_option_values(self, product_option_id: str | int, only_id: bool = False):
-        return self.all_items(f"product-options/{product_option_id}/product-option-values", only_id)
+    def all_option_values(
+            self,
+            product_option_id: str | int,
+            only_id: bool = False,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ):
+        endpoint = f"product-options/{product_option_id}/product-option-values"
+        return self.all_items(endpoint, only_id, fields, include, query)
 
     def list_option_value_pivots(self, product_option_id: str | int):
         return self.get(f"product-options/{product_option_id}/relationships/product-option-values")
@@ -373,7 +657,7 @@ class ProductOptions(BaseClient):
 
         return self._r.patch(
             f"product-options/{product_option_id}/relationships/product-option-values",
-            data=json.dumps(pivots)
+            data=pivots
         )
 
 
@@ -418,7 +702,7 @@ class ProductOptionValues(BaseClient):
 
         return self._r.patch(
             f"product-option-values/{product_option_value_id}/relationships/product-suboptions",
-            data=json.dumps(data)
+            data=data
         )
 
 
@@ -466,8 +750,9 @@ class ProductTags(BaseClient):
     }
 
     # Convencience
-    def add_tag_to_product(self, product_id: str | int, tag_name: str, tag_value: str):
-        tag = {
+    @staticmethod
+    def tag_document(product_id: str | int, tag_name: str, tag_value: str) -> dict:
+        return {
             "data": {
                 "type": "product-tags",
                 "attributes": {
@@ -484,7 +769,9 @@ class ProductTags(BaseClient):
                 }
             }
         }
-        return self.create(json.dumps(tag))
+
+    def add_tag_to_product(self, product_id: str | int, tag_name: str, tag_value: str):
+        return self.create(self.tag_document(product_id, tag_name, tag_value))
 
 
 class ProductCustomerGroupPrices(BaseClient):
@@ -520,20 +807,44 @@ class Orders(BaseClient):
     }
 
     # Relationships
-    def complete_order(self, order_id: int | str, data: str | dict):
+    def complete_order(self, order_id: int | str, data: str | bytes | dict):
         return self._r.patch(f"orders/{order_id}/complete", data, vnd=False)
 
-    def order_totals(self, order_id: int | str):
-        return self.all_items(f"orders/{order_id}/order-totals")
+    def order_totals(
+            self,
+            order_id: int | str,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ):
+        return self.all_items(f"orders/{order_id}/order-totals", False, fields, include, query)
 
-    def order_products(self, order_id: int | str):
-        return self.all_items(f"orders/{order_id}/order-products")
+    def order_products(
+            self,
+            order_id: int | str,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ):
+        return self.all_items(f"orders/{order_id}/order-products", False, fields, include, query)
 
-    def order_status_history(self, order_id: int | str):
-        return self.all_items(f"orders/{order_id}/order-status-history")
+    def order_status_history(
+            self,
+            order_id: int | str,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ):
+        return self.all_items(f"orders/{order_id}/order-status-history", False, fields, include, query)
 
-    def order_tags(self, order_id: int | str):
-        return self.all_items(f"orders/{order_id}/order-tags")
+    def order_tags(
+            self,
+            order_id: int | str,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ):
+        return self.all_items(f"orders/{order_id}/order-tags", False, fields, include, query)
 
     # TODO: Figure out convenience methods for orders
 
@@ -845,4 +1156,65 @@ class ProductSets(BaseClient):
         "create": True,
         "update": False,
         "delete": True,
-    }
\ No newline at end of file
+    }
+
+
+class Client(BaseClient):
+
+    """
+    Entry point for one store. Resource clients are created on first access and share one Requestor.
+    """
+
+    batch = LazyResource(Batch)
+    products = LazyResource(Products)
+    categories = LazyResource(Categories)
+    customers = LazyResource(Customers)
+    customer_groups = LazyResource(CustomerGroups)
+    customer_login_tokens = LazyResource(CustomerLoginTokens)
+    images = LazyResource(Images)
+    product_attributes = LazyResource(ProductAttributes)
+    product_variants = LazyResource(ProductVariants)
+    product_specials = LazyResource(ProductSpecials)
+    product_reviews = LazyResource(ProductReviews)
+    product_options = LazyResource(ProductOptions)
+    product_suboptions = LazyResource(ProductSuboptions)
+    product_option_values = LazyResource(ProductOptionValues)
+    product_properties = LazyResource(ProductProperties)
+    product_property_options = LazyResource(ProductPropertyOptions)
+    product_property_values = LazyResource(ProductPropertyValues)
+    product_tags = LazyResource(ProductTags)
+    product_customer_group_prices = LazyResource(ProductCustomerGroupPrices)
+    product_attribute_customer_group_prices = LazyResource(ProductAttributeCustomerGroupPrices)
+    orders = LazyResource(Orders)
+    order_products = LazyResource(OrderProducts)
+    order_product_attributes = LazyResource(OrderProductAttributes)
+    order_status = LazyResource(OrderStatus)
+    order_status_history = LazyResource(OrderStatusHistory)
+    order_tags = LazyResource(OrderTags)
+    order_totals = LazyResource(OrderTotals)
+    manufacturers = LazyResource(Manufacturers)
+    suppliers = LazyResource(Suppliers)
+    discounts = LazyResource(Discounts)
+    tax_classes = LazyResource(TaxClasses)
+    visitors = LazyResource(Visitors)
+    redirects = LazyResource(Redirects)
+    settings = LazyResource(Settings)
+    shipping = LazyResource(Shipping)
+    payment = LazyResource(Payment)
+    currencies = LazyResource(Currencies)
+    languages = LazyResource(Languages)
+    product_tabs = LazyResource(ProductTabs)
+    campaigns = LazyResource(Campaigns)
+    campaign_products = LazyResource(CampaignProducts)
+    stock_groups = LazyResource(StockGroups)
+    stock_group_rules = LazyResource(StockGroupRules)
+    product_tab_descriptions = LazyResource(ProductTabDescriptions)
+    product_sets = LazyResource(ProductSets)
+
+    def __init__(self, session: requests.Session, store: str, requestor: Requestor | None = None):
+        super().__init__(session, store, requestor)
+        self.store = store
+
+
+# Resource attribute names on Client, mapped to the classes serving them
+RESOURCES = {name: attr.resource for name, attr in vars(Client).items() if isinstance(attr, LazyResource)}
@@ -20,6 +20,10 @@ class MystoreError(Exception):
 
 
 class ApiError(MystoreError):
+    # Set by Requestor: how many times the request was retried, and the seconds spent waiting between attempts
+    retries = 0
+    retry_wait = 0.0
+
     def __init__(self, error: Exception):
         super().__init__(get_message(error))
         self.__cause__ = self.error = error
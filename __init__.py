@@ -1,2 +1,4 @@
 from .MsConnection import Client
-from .session import TokenSession
\ No newline at end of file
+from .async_client import AsyncClient
+from .query import Query
+from .session import TokenSession
@@ -0,0 +1,482 @@
+import asyncio
+import logging
+import os
+from typing import AsyncIterator, Iterable
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp is an optional dependency, see the "async" extra in setup.py
+    aiohttp = None
+
+from .batch import AsyncBatchBuilder, BatchOperation, BatchResult, BulkReport, batch_unavailable
+from .MsConnection import BaseClient, Batch, Categories, Images, Products, RESOURCES, _resource_type
+from .MsExceptions import MsExceptions
+from .ratelimit import RateLimiter
+from .checkpoint import FileCheckpoint, SQLiteCheckpoint
+from .query import Query
+from .relationships import PRODUCT_RELATIONSHIPS, AsyncRelationshipFetcher
+from .session import Page, Requestor, add_params
+from .singleflight import AsyncSingleFlight
+from .uploads import UploadReport, image_mime, upload_directory_async
+
+
+def _build_response(resp, content: bytes) -> requests.Response:
+    """
+    Wraps an aiohttp response in a requests.Response, so resource code and MsExceptions work unchanged.
+    """
+    response = requests.Response()
+    response.status_code = resp.status
+    response.reason = resp.reason
+    response.headers = CaseInsensitiveDict(resp.headers)
+    response.url = str(resp.url)
+    response._content = content
+    return response
+
+
+class AsyncRequestor(Requestor):
+
+    """
+    Asyncio counterpart of Requestor, sending requests through aiohttp.
+    At most max_concurrency requests are in flight at once, and the rate_limiter of the session is honoured.
+    The session is only used as the source of headers and rate limiter, it never sends anything itself.
+    Identical GETs in flight at the same time are coalesced by an AsyncSingleFlight of its own,
+    unless the session has single_flight disabled.
+    """
+
+    def __init__(
+            self,
+            session: requests.Session,
+            store: str,
+            max_concurrency: int = 10,
+            rate_limiter: RateLimiter | None = None
+    ):
+        if aiohttp is None:
+            raise ImportError("AsyncRequestor requires aiohttp, install it with 'pip install MsConnection[async]'")
+
+        super().__init__(session, store, rate_limiter)
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._http = None
+        self.single_flight = AsyncSingleFlight() if self.single_flight is not None else None
+
+    @property
+    def http(self):
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.max_concurrency))
+        return self._http
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+
+    async def _request(
+            self,
+            method: str,
+            path: str,
+            vnd: bool = True,
+            data: str | bytes | dict | list | None = None,
+            content_type: str | None = None,
+            files: dict | None = None,
+            headers: dict | None = None
+    ):
+
+        url = self._url(path)
+        logging.debug(url)
+
+        headers = self._get_headers(vnd, content_type, headers)
+
+        if isinstance(data, (dict, list)):
+            data = self.codec.dumps(data)
+
+        if files is not None:
+            headers.pop("Content-Type", None)
+            data = aiohttp.FormData()
+            for name, (filename, file, file_type) in files.items():
+                data.add_field(name, file, filename=filename, content_type=file_type)
+
+        endpoint = self._endpoint(url)
+        attempt = 0
+        waited = 0.0
+
+        while True:
+            attempt += 1
+
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async()
+
+            body, body_headers = self._compress(endpoint, data)
+            request_headers = {**headers, **body_headers}
+
+            async with self._semaphore:
+                try:
+                    async with self.http.request(method, url, headers=request_headers, data=body) as resp:
+                        response = _build_response(resp, await resp.read())
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    response = None
+                    error = MsExceptions.ApiError(e)
+
+            if response is not None:
+                self._record_transfer(endpoint, data, body, response)
+
+                if self.rate_limiter is not None:
+                    self.rate_limiter.update_from_response(response)
+
+                if self._rejected_compression(endpoint, response, body_headers):
+                    continue
+
+                if response.ok:
+                    if method != 'GET':
+                        self._after_write(method, url, data, response)
+                    return response
+
+                error = MsExceptions.ResponseError(response)
+
+            delay = self._retry_delay(method, url, attempt, waited, response, error)
+            if delay is None:
+                raise error
+
+            waited += delay
+            await asyncio.sleep(delay)
+
+    async def get(self, path: str, vnd: bool = True):
+        if self.single_flight is None:
+            return await self._request('GET', path, vnd=vnd)
+
+        url = self._url(path)
+        return await self.single_flight.do(self._flight_key(url, vnd), lambda: self._request('GET', url, vnd=vnd))
+
+    async def post(self, path: str, data: str | bytes | dict, vnd: bool = True):
+        return await self._request('POST', path, vnd=vnd, data=data)
+
+    async def patch(self, path: str, data: str | bytes | dict, vnd: bool = True):
+        return await self._request('PATCH', path, vnd=vnd, data=data)
+
+    async def delete(self, path: str, vnd: bool = True):
+        return await self._request('DELETE', path, vnd=vnd)
+
+    async def iter_pages(
+            self,
+            endpoint: str,
+            params: dict | None = None,
+            checkpoint: FileCheckpoint | SQLiteCheckpoint | None = None
+    ) -> AsyncIterator[Page]:
+        first_page = add_params(endpoint, params)
+        next_page, emitted = self._resume(first_page, checkpoint)
+
+        while next_page is not None:
+            page = Page.from_document(self.decode(await self.get(next_page)))
+            next_page = page.next
+
+            yield page
+
+            emitted = self._save_checkpoint(first_page, page, emitted, checkpoint)
+
+    async def iter_paginated(
+            self,
+            endpoint: str,
+            params: dict | None = None,
+            checkpoint: FileCheckpoint | SQLiteCheckpoint | None = None
+    ) -> AsyncIterator[dict]:
+        async for page in self.iter_pages(endpoint, params, checkpoint):
+            for item in page.data:
+                yield item
+
+    async def get_paginated(self, endpoint: str, params: dict | None = None) -> list:
+        return [item async for item in self.iter_paginated(endpoint, params)]
+
+
+class AsyncBaseClient(BaseClient):
+
+    """
+    Async versions of the BaseClient methods. Combined with a resource class from MsConnection.py
+    it reuses that class' endpoint, vnd flag, permissions and relationship helpers.
+    """
+
+    def __init__(self, requestor: AsyncRequestor):
+        self._r = requestor
+
+    async def iter_items(
+            self,
+            endpoint: str,
+            only_id: bool = False,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            checkpoint: FileCheckpoint | SQLiteCheckpoint | None = None,
+            query: Query | None = None
+    ) -> AsyncIterator:
+        params = self._read_params(_resource_type(endpoint), only_id, fields, include, query)
+        async for item in self._r.iter_paginated(endpoint, params, checkpoint):
+            yield item['id'] if only_id else item
+
+    async def all_items(
+            self,
+            endpoint: str,
+            only_id: bool = False,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ):
+        return [item async for item in self.iter_items(endpoint, only_id, fields, include, query=query)]
+
+    def iter_pages(
+            self,
+            endpoint: str | None = None,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            checkpoint: FileCheckpoint | SQLiteCheckpoint | None = None,
+            query: Query | None = None
+    ) -> AsyncIterator[Page]:
+        self._validate_call("all")
+        endpoint = self.endpoint if endpoint is None else endpoint
+        params = self._read_params(_resource_type(endpoint), False, fields, include, query)
+        return self._r.iter_pages(endpoint, params, checkpoint)
+
+    def iter_all(
+            self,
+            only_id: bool = False,
+            endpoint: str | None = None,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            checkpoint: FileCheckpoint | SQLiteCheckpoint | None = None,
+            query: Query | None = None
+    ) -> AsyncIterator:
+        self._validate_call("all")
+        endpoint = self.endpoint if endpoint is None else endpoint
+        return self.iter_items(endpoint, only_id, fields, include, checkpoint, query)
+
+    async def all(
+            self,
+            only_id: bool = False,
+            endpoint: str | None = None,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ) -> list:
+        return [item async for item in self.iter_all(only_id, endpoint, fields, include, query=query)]
+
+    async def get_document(
+            self,
+            item_id: int | str | None,
+            endpoint: str | None = None,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ) -> dict:
+
+        if item_id is None and endpoint is None:
+            raise MsExceptions.MissingID("Call has no item_id")
+
+        self._validate_call("get")
+        path = f"{self.endpoint}/{item_id}" if endpoint is None else endpoint
+        params = self._read_params(self.endpoint, False, fields, include, query)
+        return self._r.decode(await self._r.get(add_params(path, params), vnd=self.vnd))
+
+    async def get(
+            self,
+            item_id: int | str | None,
+            endpoint: str | None = None,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None,
+            query: Query | None = None
+    ):
+        return (await self.get_document(item_id, endpoint, fields, include, query))['data']
+
+    async def create(self, data: str | bytes | dict, endpoint: str | None = None):
+
+        self._validate_call("create")
+        return await self._r.post(self.endpoint if endpoint is None else endpoint, data, vnd=self.vnd)
+
+    async def update(self, item_id: str | int, data: str | bytes | dict):
+
+        self._validate_call("update")
+        return await self._r.patch(f"{self.endpoint}/{item_id}", data, vnd=self.vnd)
+
+    async def delete(self, item_id) -> int:
+
+        self._validate_call("delete")
+        return (await self._r.delete(f"{self.endpoint}/{item_id}", vnd=self.vnd)).status_code
+
+    async def get_singleton(self, endpoint: str | None = None):
+        self._validate_call("all")
+        return self._r.decode(await self._r.get(f"{self.endpoint}" if endpoint is None else endpoint, vnd=self.vnd))
+
+    # Bulk, the operations are built by AsyncBatchBuilder as in BaseClient, chunks and single operations are sent
+    # concurrently, bounded by max_concurrency of the AsyncRequestor. max_workers is kept for signature compatibility.
+
+    async def create_many(
+            self,
+            items: Iterable[str | dict],
+            use_batch: bool = True,
+            max_workers: int = 4
+    ) -> BulkReport:
+        self._validate_call("create")
+        builder = self._bulk_builder(max_workers)
+        for data in items:
+            builder.create(self, data)
+        return await self._send_bulk(builder, use_batch, max_workers)
+
+    async def update_many(
+            self,
+            items: dict | Iterable[tuple[str | int, str | dict]],
+            use_batch: bool = True,
+            max_workers: int = 4
+    ) -> BulkReport:
+        self._validate_call("update")
+        builder = self._bulk_builder(max_workers)
+        for item_id, data in (items.items() if isinstance(items, dict) else items):
+            builder.update(self, item_id, data, key=item_id)
+        return await self._send_bulk(builder, use_batch, max_workers)
+
+    async def delete_many(
+            self,
+            item_ids: Iterable[str | int],
+            use_batch: bool = True,
+            max_workers: int = 4
+    ) -> BulkReport:
+        self._validate_call("delete")
+        builder = self._bulk_builder(max_workers)
+        for item_id in item_ids:
+            builder.delete(self, item_id, key=item_id)
+        return await self._send_bulk(builder, use_batch, max_workers)
+
+    def _bulk_builder(self, max_workers: int) -> AsyncBatchBuilder:
+        return AsyncBatchBuilder(AsyncBatch(self._r), max_workers=max_workers)
+
+    async def _send_bulk(self, builder: AsyncBatchBuilder, use_batch: bool, max_workers: int) -> BulkReport:
+        if not use_batch:
+            return BulkReport(await self._send_operations(builder.operations, max_workers))
+
+        results = await builder.send()
+
+        unavailable = [i for i, result in enumerate(results) if batch_unavailable(result)]
+        if unavailable:
+            logging.debug(f"Batch endpoint unavailable, sending {len(unavailable)} operations one by one")
+            retried = await self._send_operations([results[i].operation for i in unavailable], max_workers)
+            for i, result in zip(unavailable, retried):
+                results[i] = result
+
+        return BulkReport(results)
+
+    async def _send_operations(self, operations: list[BatchOperation], max_workers: int) -> list[BatchResult]:
+        return list(await asyncio.gather(*(self._send_operation(operation) for operation in operations)))
+
+    async def _send_operation(self, operation: BatchOperation) -> BatchResult:
+        try:
+            response = await self._r._request(operation.method, operation.path, vnd=self.vnd, data=operation.body)
+        except MsExceptions.ApiError as e:
+            return BatchResult(operation, getattr(e, "status_code", None), None, e)
+
+        try:
+            body = self._r.decode(response)
+        except ValueError:
+            body = None
+
+        return BatchResult(operation, response.status_code, body)
+
+
+class AsyncBatch(AsyncBaseClient, Batch):
+    def builder(
+            self,
+            max_operations: int = 100,
+            max_bytes: int = 1_000_000,
+            max_workers: int = 4
+    ) -> AsyncBatchBuilder:
+        return AsyncBatchBuilder(self, max_operations, max_bytes, max_workers)
+
+
+class AsyncProducts(AsyncBaseClient, Products):
+
+    # Relationship helpers that read the response, the rest are shared with Products as is
+
+    async def relationships_categories(self, product_id: int) -> tuple:
+        response = self._r.decode(await self._r.get(f"products/{product_id}/relationships/categories"))
+        return tuple(int(item['id']) for item in response['data'])
+
+    async def update_relationships_categories(self, product_id: int, categories: tuple | list) -> int:
+        data = {'data': [{'id': category, 'type': 'categories'} for category in categories]}
+        return (await self._r.patch(f"products/{product_id}/relationships/categories", data)).status_code
+
+    async def related(
+            self,
+            product_ids: Iterable[int | str],
+            relationships: Iterable[str] = PRODUCT_RELATIONSHIPS,
+            use_include: bool = True,
+            max_workers: int = 8
+    ) -> dict[str, dict[str, list]]:
+        self._validate_call("get")
+        return await AsyncRelationshipFetcher(self, relationships, use_include, max_workers).fetch(product_ids)
+
+
+class AsyncCategories(AsyncBaseClient, Categories):
+
+    async def update_relationships_products(self, category_id: int, products: tuple | list) -> int:
+        data = {'data': [{'id': product, 'type': 'products'} for product in products]}
+        return (await self._r.patch(f"products/{category_id}/relationships/products", data)).status_code
+
+
+class AsyncImages(AsyncBaseClient, Images):
+
+    async def upload_image(self, path: str, file_path: str):
+
+        """
+        Uploads one image as multipart/form-data, aiohttp streams the file from disk.
+        The file is kept open until the upload has finished.
+        """
+
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        mime = image_mime(file_path)
+        with open(file_path, 'rb') as file:
+            files = {"image": (os.path.basename(file_path), file, mime)}
+            return await self._r._request('POST', path, vnd=False, files=files)
+
+    async def upload_directory(
+            self,
+            directory: str,
+            path: str = "images",
+            manifest_path: str | None = None,
+            max_workers: int = 4,
+            recursive: bool = False
+    ) -> UploadReport:
+        return await upload_directory_async(self, directory, path, manifest_path, max_workers, recursive)
+
+
+def _async_resource(resource: type) -> type:
+    return type(f"Async{resource.__name__}", (AsyncBaseClient, resource), {})
+
+
+ASYNC_RESOURCES = {
+    name: {Batch: AsyncBatch, Products: AsyncProducts, Categories: AsyncCategories, Images: AsyncImages}.get(resource) or _async_resource(resource)
+    for name, resource in RESOURCES.items()
+}
+
+
+class AsyncClient:
+
+    """
+    Asyncio version of Client with the same resource attributes and permissions.
+    All resources share one AsyncRequestor, so max_concurrency bounds the requests in flight for the whole client.
+
+    async with AsyncClient(TokenSession(token, agent), store) as client:
+        categories = await asyncio.gather(*(client.products.categories(pid) for pid in product_ids))
+    """
+
+    def __init__(self, session: requests.Session, store: str, max_concurrency: int = 10):
+        self._r = AsyncRequestor(session, store, max_concurrency)
+
+        for name, resource in ASYNC_RESOURCES.items():
+            setattr(self, name, resource(self._r))
+
+    async def close(self):
+        await self._r.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
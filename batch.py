@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Hashable, NamedTuple
+
+from .MsExceptions import MsExceptions
+
+if TYPE_CHECKING:
+    from .MsConnection import BaseClient, Batch
+
+
+# Statuses of a whole batch request meaning the batch endpoint cannot be used, bulk methods then send one by one
+BATCH_UNAVAILABLE = (403, 404, 405, 501)
+
+
+class BatchOperation(NamedTuple):
+    method: str
+    path: str
+    body: dict | None
+    key: Hashable  # Caller supplied reference, returned on the matching BatchResult
+
+    def to_dict(self) -> dict:
+        operation = {"method": self.method, "url": f"/{self.path}"}
+        if self.body is not None:
+            operation["body"] = self.body
+        return operation
+
+
+class BatchResult(NamedTuple):
+    operation: BatchOperation
+    status: int | None
+    body: Any
+    error: Exception | None = None
+
+    @property
+    def key(self) -> Hashable:
+        return self.operation.key
+
+    @property
+    def ok(self) -> bool:
+        """
+        True only with a success status, a result without one is not counted as a success.
+        """
+        return self.error is None and self.status is not None and self.status < 400
+
+
+def batch_unavailable(result: BatchResult) -> bool:
+    """
+    True if the batch request carrying the operation was refused as a whole with one of BATCH_UNAVAILABLE.
+    """
+    return isinstance(result.error, MsExceptions.ResponseError) and result.error.status_code in BATCH_UNAVAILABLE
+
+
+class BulkReport(list):
+
+    """
+    List of BatchResult, one per item, with the successes and failures split out.
+    """
+
+    @property
+    def succeeded(self) -> list[BatchResult]:
+        return [result for result in self if result.ok]
+
+    @property
+    def failed(self) -> list[BatchResult]:
+        return [result for result in self if not result.ok]
+
+
+class BatchBuilder:
+
+    """
+    Collects create/update/delete operations on any resource and sends them through the batch endpoints,
+    split into as few requests as the operation count and byte size limits allow.
+
+    Non-atomic chunks are sent concurrently. Atomic work is only sent when it fits in one request,
+    since separately committed chunks would not be atomic as a whole.
+
+    The request and response envelopes are set by operations_key and results_key,
+    each result is matched to its operation by position.
+    """
+
+    operations_key = "operations"
+    results_key = "results"
+
+    def __init__(self, batch: Batch, max_operations: int = 100, max_bytes: int = 1_000_000, max_workers: int = 4):
+        self.batch = batch
+        self.max_operations = max_operations
+        self.max_bytes = max_bytes
+        self.max_workers = max_workers
+        self.operations: list[BatchOperation] = []
+
+    def __len__(self):
+        return len(self.operations)
+
+    def _load(self, data: str | bytes | dict) -> dict:
+        return self.batch._r.codec.loads(data) if isinstance(data, (str, bytes)) else data
+
+    def add(self, method: str, path: str, body: dict | None = None, key: Hashable = None) -> BatchOperation:
+        operation = BatchOperation(method, path, body, len(self.operations) if key is None else key)
+        self.operations.append(operation)
+        return operation
+
+    def create(self, resource: BaseClient, data: str | dict, key: Hashable = None) -> BatchOperation:
+        resource._validate_call("create")
+        return self.add("POST", resource.endpoint, self._load(data), key)
+
+    def update(self, resource: BaseClient, item_id: str | int, data: str | dict, key: Hashable = None) -> BatchOperation:
+        resource._validate_call("update")
+        return self.add("PATCH", f"{resource.endpoint}/{item_id}", self._load(data), key)
+
+    def delete(self, resource: BaseClient, item_id: str | int, key: Hashable = None) -> BatchOperation:
+        resource._validate_call("delete")
+        return self.add("DELETE", f"{resource.endpoint}/{item_id}", None, key)
+
+    def chunks(self) -> list[list[BatchOperation]]:
+        """
+        Packs the operations, in order, into chunks within max_operations and max_bytes.
+        An operation larger than max_bytes on its own is sent alone.
+        """
+        envelope_size = len(self.encode([]))
+        chunks = []
+        chunk = []
+        size = envelope_size
+
+        for operation in self.operations:
+            operation_size = len(self.batch._r.codec.dumps(operation.to_dict())) + 1
+
+            if chunk and (len(chunk) >= self.max_operations or size + operation_size > self.max_bytes):
+                chunks.append(chunk)
+                chunk = []
+                size = envelope_size
+
+            chunk.append(operation)
+            size += operation_size
+
+        if chunk:
+            chunks.append(chunk)
+
+        return chunks
+
+    def encode(self, operations: list[BatchOperation]) -> bytes:
+        return self.batch._r.codec.dumps({self.operations_key: [operation.to_dict() for operation in operations]})
+
+    def _parse_results(self, operations: list[BatchOperation], document: dict) -> list[BatchResult]:
+        """
+        Matches results to operations by position. An operation without a result, or with a result that has
+        neither a status nor data, gets an error, so an unexpected response envelope is never taken as success.
+        """
+        results = document.get(self.results_key) if isinstance(document, dict) else None
+        results = results if isinstance(results, list) else []
+        output = []
+
+        for i, operation in enumerate(operations):
+            result = results[i] if i < len(results) else None
+
+            if not isinstance(result, dict):
+                error = MsExceptions.MystoreError(f"No result for operation {operation.method} {operation.path}")
+                output.append(BatchResult(operation, None, result, error))
+                continue
+
+            body = result.get("body", result)
+            try:
+                status = int(result["status"])
+            except (KeyError, TypeError, ValueError):
+                status = None
+
+            if status is None and isinstance(body, dict) and "data" in body and "errors" not in body:
+                status = 200
+            if status is None or status >= 400:
+                error = MsExceptions.MystoreError(f"Operation {operation.method} {operation.path} failed: {result}")
+                output.append(BatchResult(operation, status, body, error))
+            else:
+                output.append(BatchResult(operation, status, body))
+
+        return output
+
+    def _send_chunk(self, operations: list[BatchOperation], atomic: bool) -> list[BatchResult]:
+        data = self.encode(operations)
+
+        try:
+            response = self.batch.atomic(data) if atomic else self.batch.non_atomic(data)
+        except MsExceptions.ApiError as e:
+            return self._failed(operations, e)
+
+        return self._parse_response(operations, response)
+
+    @staticmethod
+    def _failed(operations: list[BatchOperation], error: MsExceptions.ApiError) -> list[BatchResult]:
+        status = error.status_code if isinstance(error, MsExceptions.ResponseError) else None
+        return [BatchResult(operation, status, None, error) for operation in operations]
+
+    def _parse_response(self, operations: list[BatchOperation], response) -> list[BatchResult]:
+        try:
+            document = self.batch._r.decode(response)
+        except ValueError:
+            document = {}
+
+        return self._parse_results(operations, document)
+
+    def _take_chunks(self, atomic: bool) -> list[list[BatchOperation]]:
+        """
+        Chunks the collected operations and clears the builder.
+        :raise ValueError: If atomic work does not fit in one chunk, the builder is then left unchanged
+        """
+        chunks = self.chunks()
+        if atomic and len(chunks) > 1:
+            raise ValueError(
+                f"{len(self.operations)} operations need {len(chunks)} batch requests, atomic work must fit in one "
+                f"(max_operations={self.max_operations}, max_bytes={self.max_bytes})"
+            )
+
+        self.operations = []
+        return chunks
+
+    def send(self, atomic: bool = False) -> list[BatchResult]:
+        """
+        Sends every collected operation and clears the builder.
+        :param atomic: Send all operations in one request to the atomic-batch endpoint instead of non-atomic-batch
+        :return: One BatchResult per operation, in the order they were added
+        :raise ValueError: With atomic, if the operations do not fit in one request
+        """
+        chunks = self._take_chunks(atomic)
+
+        if atomic:
+            return self._send_chunk(chunks[0], atomic=True) if chunks else []
+
+        if len(chunks) <= 1 or self.max_workers <= 1:
+            return [result for chunk in chunks for result in self._send_chunk(chunk, atomic=False)]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return [
+                result
+                for chunk_results in executor.map(lambda chunk: self._send_chunk(chunk, False), chunks)
+                for result in chunk_results
+            ]
+
+
+class AsyncBatchBuilder(BatchBuilder):
+
+    """
+    BatchBuilder for the batch resource of an AsyncClient. Non-atomic chunks are sent concurrently,
+    bounded by max_concurrency of the AsyncRequestor instead of max_workers.
+    """
+
+    async def _send_chunk(self, operations: list[BatchOperation], atomic: bool) -> list[BatchResult]:
+        data = self.encode(operations)
+
+        try:
+            response = await (self.batch.atomic(data) if atomic else self.batch.non_atomic(data))
+        except MsExceptions.ApiError as e:
+            return self._failed(operations, e)
+
+        return self._parse_response(operations, response)
+
+    async def send(self, atomic: bool = False) -> list[BatchResult]:
+        chunks = self._take_chunks(atomic)
+
+        if atomic:
+            return await self._send_chunk(chunks[0], atomic=True) if chunks else []
+
+        sent = await asyncio.gather(*(self._send_chunk(chunk, atomic=False) for chunk in chunks))
+        return [result for chunk_results in sent for result in chunk_results]
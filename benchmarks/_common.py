@@ -0,0 +1,116 @@
+"""
+Helpers shared by the benchmark scripts: loading the package from the repository root and a local stub API server.
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The repository root is the MsConnection package, load it under that name when it is not installed
+installed = importlib.util.find_spec("MsConnection")
+if installed is None or installed.submodule_search_locations is None:
+    spec = importlib.util.spec_from_file_location(
+        "MsConnection", os.path.join(ROOT, "__init__.py"), submodule_search_locations=[ROOT]
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["MsConnection"] = module
+    spec.loader.exec_module(module)
+
+
+def product(item_id: int) -> dict:
+    return {
+        "type": "products",
+        "id": str(item_id),
+        "attributes": {
+            "sku": f"SKU-{item_id:06d}",
+            "model": f"M{item_id % 500}",
+            "price": "199.00",
+            "quantity": item_id % 40,
+            "status": 1,
+            "name": {"no": f"Produkt {item_id}", "en": f"Product {item_id}"},
+            "updated_at": "2024-01-01 10:00:00",
+        },
+        "relationships": {
+            "categories": {"data": [{"type": "categories", "id": str(item_id % 50)}]},
+            "manufacturer": {"data": {"type": "manufacturers", "id": str(item_id % 20)}},
+        },
+    }
+
+
+def page_document(number: int, page_size: int, pages: int, base_url: str) -> dict:
+    first = (number - 1) * page_size
+    links = {"self": f"{base_url}?page[number]={number}"}
+    if number < pages:
+        links["next"] = f"{base_url}?page[number]={number + 1}"
+    return {
+        "data": [product(item_id) for item_id in range(first, first + page_size)],
+        "links": links,
+        "meta": {"pagination": {"total": pages * page_size}},
+    }
+
+
+class StubServer(ThreadingHTTPServer):
+
+    """
+    Local API serving `pages` pages of `page_size` products on every collection path, answering after `latency` seconds.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, pages: int = 20, page_size: int = 100, latency: float = 0.02):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.pages = pages
+        self.page_size = page_size
+        self.latency = latency
+        self.requests = 0
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}/shops/bench/"
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        number = int(parse_qs(url.query).get("page[number]", ["1"])[0])
+        base_url = f"http://127.0.0.1:{self.server.server_port}{url.path}"
+
+        time.sleep(self.server.latency)
+        self.server.requests += 1
+
+        body = json.dumps(page_document(number, self.server.page_size, self.server.pages, base_url)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.api+json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def best_of(function, repeat: int = 5) -> float:
+    """
+    :return: Fastest of repeat runs of function, in seconds
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
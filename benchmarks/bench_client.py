@@ -0,0 +1,73 @@
+"""
+Client construction followed by the first request, compared with building every resource client eagerly.
+
+"eager" reproduces the old Client.__init__, which created every resource client with a Requestor of its own.
+Each client sends one request for an order to a local stub server, so the time includes that first request.
+
+    python benchmarks/bench_client.py --clients 200
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import _common
+from MsConnection import Client, TokenSession
+from MsConnection.MsConnection import LazyResource, Orders
+
+
+RESOURCES = [value.resource for value in vars(Client).values() if isinstance(value, LazyResource)]
+
+
+def eager(session: TokenSession, url: str) -> Orders:
+    clients = {resource: resource(session, "bench") for resource in RESOURCES}
+    clients[Orders]._r.base_url = url
+    return clients[Orders]
+
+
+def lazy(session: TokenSession, url: str) -> Orders:
+    client = Client(session, "bench")
+    client._r.base_url = url
+    return client.orders
+
+
+def measure(build, session: TokenSession, url: str, clients: int) -> tuple[float, int]:
+    """
+    :return: Microseconds per client and bytes allocated per client, for construction and the first request
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    kept = []
+    for _ in range(clients):
+        orders = build(session, url)
+        orders.get(1)
+        kept.append(orders)
+    seconds = time.perf_counter() - start
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return seconds / clients * 1e6, allocated // clients
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=200)
+    args = parser.parse_args()
+
+    server = _common.StubServer(pages=1, page_size=1, latency=0)
+    session = TokenSession("token", "benchmark", requests_per_second=None, single_flight=False)
+    session.trust_env = False
+    print(f"{len(RESOURCES)} resource clients, {args.clients} clients per run")
+
+    try:
+        # Warms up the connection pool, so neither run pays for the first connection
+        lazy(session, server.url).get(1)
+        for name, build in [("eager: every resource, own Requestor", eager), ("lazy: Client()", lazy)]:
+            microseconds, allocated = measure(build, session, server.url, args.clients)
+            print(f"{name:<40} {microseconds:8.1f} us/client  {allocated / 1024:8.1f} KiB/client")
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Encoding a large batch document and decoding 1,000-item pages, with the old stdlib calls and every available codec.
+
+"stdlib, indent=2" reproduces the old utils.convert_object_to_json_str and response.json().
+
+    python benchmarks/bench_codec.py --operations 1000 --items 1000
+"""
+
+import argparse
+import json
+
+import _common
+from MsConnection.batch import BatchBuilder, BatchOperation
+from MsConnection.codec import get_codec
+
+
+def batch_document(operations: int) -> dict:
+    """
+    The request document BatchBuilder sends for operations product updates.
+    """
+    updates = []
+    for item_id in range(operations):
+        body = {"data": {"type": "products", "id": str(item_id), "attributes": _common.product(item_id)["attributes"]}}
+        updates.append(BatchOperation("PATCH", f"products/{item_id}", body, item_id).to_dict())
+    return {BatchBuilder.operations_key: updates}
+
+
+def codecs() -> list:
+    available = [("stdlib, indent=2", lambda obj: json.dumps(obj, indent=2).encode(), json.loads)]
+    for name in ("json", "orjson"):
+        try:
+            codec = get_codec(name)
+        except ImportError:
+            print(f"{name} codec not installed, skipped")
+            continue
+        available.append((type(codec).__name__, codec.dumps, codec.loads))
+    return available
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=1000, help="Operations in the batch document")
+    parser.add_argument("--items", type=int, default=1000, help="Items per decoded page")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    document = batch_document(args.operations)
+    page = json.dumps(_common.page_document(1, args.items, 1, "http://stub/products")).encode()
+
+    print(f"Batch document of {args.operations} operations, page of {args.items} items ({len(page) / 1024:.0f} KiB)")
+    for name, dumps, loads in codecs():
+        encoded = dumps(document)
+        encode = _common.best_of(lambda: dumps(document), args.repeat)
+        decode = _common.best_of(lambda: loads(page), args.repeat)
+        print(
+            f"{name:<20} encode {encode * 1000:7.2f} ms  {len(encoded) / 1024:7.0f} KiB  "
+            f"decode {decode * 1000:7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Crawl time of a paginated resource against a local stub server, before and after the token-bucket rate limiter.
+
+"before" reproduces the old Requestor.get_paginated, which slept 0.5 s after every page.
+"after" crawls with the RateLimiter of TokenSession at its default budget and with rate limiting disabled.
+
+    python benchmarks/bench_crawl.py --pages 20 --latency 0.02
+"""
+
+import argparse
+import time
+
+import _common  # noqa: F401, loads the package
+from MsConnection import Client, TokenSession
+
+
+def client(server, requests_per_second: float | None) -> Client:
+    session = TokenSession("token", "benchmark", requests_per_second=requests_per_second, single_flight=False)
+    session.trust_env = False
+    client = Client(session, "bench")
+    client._r.base_url = server.url
+    return client
+
+
+def crawl_before(server) -> int:
+    requestor = client(server, None)._r
+    items = 0
+    for page in requestor.iter_pages("products"):
+        items += len(page.data)
+        time.sleep(0.5)
+    return items
+
+
+def crawl_after(server, requests_per_second: float | None) -> int:
+    return sum(1 for _ in client(server, requests_per_second).products.iter_all())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.02, help="Server response time in seconds")
+    args = parser.parse_args()
+
+    server = _common.StubServer(args.pages, args.page_size, args.latency)
+    runs = [
+        ("before: 0.5 s sleep per page", lambda: crawl_before(server)),
+        ("after: RateLimiter at 5 requests/s", lambda: crawl_after(server, 5.0)),
+        ("after: rate limiting disabled", lambda: crawl_after(server, None)),
+    ]
+
+    print(f"{args.pages} pages of {args.page_size} products, {args.latency * 1000:.0f} ms server latency")
+    try:
+        for name, run in runs:
+            start = time.perf_counter()
+            items = run()
+            seconds = time.perf_counter() - start
+            print(f"{name:<40} {seconds:7.2f} s  {args.pages / seconds:6.1f} pages/s  ({items} items)")
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Memory held by 100k products decoded page by page, as raw dicts and as Model objects of an IdentityMap.
+
+    python benchmarks/bench_models.py --products 100000
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+import _common
+from MsConnection.models import IdentityMap
+from MsConnection.session import Page
+
+
+def pages(products: int, page_size: int):
+    """
+    Yields the encoded pages, so only one page of JSON exists at a time.
+    """
+    count = (products + page_size - 1) // page_size
+    for number in range(1, count + 1):
+        yield json.dumps(_common.page_document(number, page_size, count, "http://stub/products")).encode()
+
+
+def as_dicts(products: int, page_size: int) -> list:
+    items = []
+    for body in pages(products, page_size):
+        items.extend(json.loads(body)["data"])
+    return items
+
+
+def as_models(products: int, page_size: int) -> IdentityMap:
+    identity_map = IdentityMap()
+    for body in pages(products, page_size):
+        identity_map.load_page(Page.from_document(json.loads(body)))
+    return identity_map
+
+
+def measure(load, products: int, page_size: int) -> tuple[float, float]:
+    """
+    :return: MiB held once loading is done, and seconds taken
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    held = load(products, page_size)
+    seconds = time.perf_counter() - start
+    gc.collect()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return current / 2 ** 20, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{args.products} products in pages of {args.page_size}")
+    for name, load in [("raw dicts", as_dicts), ("IdentityMap models", as_models)]:
+        mebibytes, seconds = measure(load, args.products, args.page_size)
+        print(f"{name:<20} {mebibytes:8.1f} MiB  {mebibytes * 2 ** 20 / args.products:7.0f} B/product  {seconds:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
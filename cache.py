@@ -0,0 +1,214 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+class CacheEntry(NamedTuple):
+    endpoint: str
+    status_code: int
+    headers: dict
+    content: bytes
+    expires: float
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires
+
+    @property
+    def validators(self) -> dict:
+        validators = {}
+        if "ETag" in self.headers:
+            validators["If-None-Match"] = self.headers["ETag"]
+        if "Last-Modified" in self.headers:
+            validators["If-Modified-Since"] = self.headers["Last-Modified"]
+        return validators
+
+    def to_response(self, url: str) -> requests.Response:
+        response = requests.Response()
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.url = url
+        response._content = self.content
+        return response
+
+
+class MemoryBackend:
+
+    """
+    In-memory LRU store, evicting the least recently used entry above max_entries.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, endpoint: str | None = None) -> int:
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if endpoint is None or entry.endpoint == endpoint]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteBackend:
+
+    """
+    On-disk store in an SQLite file, so cached responses survive between runs.
+    Entries beyond max_entries are evicted by last access time.
+    """
+
+    def __init__(self, path: str, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, endpoint TEXT, status_code INTEGER, headers TEXT, "
+            "content BLOB, expires REAL, accessed REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_endpoint ON responses (endpoint)")
+        self._db.commit()
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT endpoint, status_code, headers, content, expires FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+
+        endpoint, status_code, headers, content, expires = row
+        return CacheEntry(endpoint, status_code, json.loads(headers), content, expires)
+
+    def set(self, key: str, entry: CacheEntry):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, entry.endpoint, entry.status_code, json.dumps(entry.headers), entry.content, entry.expires, time.time())
+            )
+            overflow = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._db.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                    (overflow,)
+                )
+                self.evictions += overflow
+            self._db.commit()
+
+    def invalidate(self, endpoint: str | None = None) -> int:
+        with self._lock:
+            if endpoint is None:
+                cursor = self._db.execute("DELETE FROM responses")
+            else:
+                cursor = self._db.execute("DELETE FROM responses WHERE endpoint = ?", (endpoint,))
+            self._db.commit()
+            return cursor.rowcount
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class ResponseCache:
+
+    """
+    Cache for GET responses, used by Requestor.get when set on the Requestor or its TokenSession.
+
+    ttls maps an endpoint (the first path segment, e.g. "settings" or "products") to seconds,
+    other endpoints use default_ttl. Responses with an ETag or Last-Modified are also kept after they expire
+    and revalidated with If-None-Match / If-Modified-Since, a 304 answer then counts as a revalidation.
+    Writes through the Requestor invalidate every entry of the endpoint they touch, batch writes clear the cache.
+    """
+
+    def __init__(
+            self,
+            backend: MemoryBackend | SQLiteBackend | None = None,
+            default_ttl: float = 0.0,
+            ttls: dict[str, float] | None = None
+    ):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.default_ttl = default_ttl
+        self.ttls = ttls if ttls is not None else {}
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def _count(self, counter: str, amount: int = 1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "invalidations": self.invalidations,
+            "evictions": self.backend.evictions,
+            "entries": len(self.backend),
+        }
+
+    def get(self, key: str) -> CacheEntry | None:
+        """
+        :return: The cached entry, fresh or not, or None. Only a fresh entry counts as a hit.
+        """
+        entry = self.backend.get(key)
+        self._count("hits" if entry is not None and entry.fresh else "misses")
+        return entry
+
+    def store(self, key: str, endpoint: str, response: requests.Response) -> CacheEntry | None:
+        ttl = self.ttls.get(endpoint, self.default_ttl)
+        headers = dict(response.headers)
+        entry = CacheEntry(endpoint, response.status_code, headers, response.content, time.time() + ttl)
+
+        if ttl <= 0 and not entry.validators:
+            return None
+
+        self.backend.set(key, entry)
+        return entry
+
+    def revalidated(self, key: str, entry: CacheEntry) -> CacheEntry:
+        """
+        Extends an entry after the server answered 304 Not Modified.
+        """
+        self._count("revalidations")
+        entry = entry._replace(expires=time.time() + self.ttls.get(entry.endpoint, self.default_ttl))
+        self.backend.set(key, entry)
+        return entry
+
+    def invalidate(self, endpoint: str | None = None):
+        """
+        Drops every entry of endpoint, or the whole cache when endpoint is None.
+        """
+        self._count("invalidations", self.backend.invalidate(endpoint))
@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+import json
+import os
+from decimal import Decimal
+from typing import TYPE_CHECKING, Iterable
+
+from . import utils
+from .batch import BatchResult
+from .query import Query
+
+if TYPE_CHECKING:
+    from .MsConnection import Client
+
+
+TAGS = "product_tags"
+
+# Products per request when reading current tags, filtered by product id
+TAG_CHUNK_SIZE = 50
+
+
+def _same(current, desired) -> bool:
+    if current == desired:
+        return True
+    if isinstance(desired, bool) or not isinstance(desired, (int, float, Decimal)):
+        return False
+    try:
+        # Prices and quantities come back as strings, e.g. "10.00" for 10
+        return Decimal(str(current)) == Decimal(str(desired))
+    except (ArithmeticError, TypeError, ValueError):
+        return False
+
+
+def diff_tags(current: dict[str, tuple[str, str]], desired: dict[str, str]) -> tuple[list[tuple[str, str]], list[str]]:
+    """
+    Tags to create and to delete to turn a product's current tags into desired. Tags cannot be updated,
+    so a tag whose value changed is deleted and created again. None values in desired are left out.
+    :param current: Tag id mapped to key and value
+    :param desired: Key mapped to value
+    :return: Key and value of the tags to create, and ids of the tags to delete
+    """
+    wanted = {(key, str(value)) for key, value in desired.items() if value is not None}
+    kept = set()
+    delete = []
+
+    for tag_id, (key, value) in current.items():
+        tag = (key, str(value))
+        if tag in wanted and tag not in kept:
+            kept.add(tag)
+        else:
+            delete.append(tag_id)
+
+    return sorted(wanted - kept), delete
+
+
+def diff_attributes(current: dict, desired: dict, default_language: str, localized: Iterable[str] = ()) -> dict:
+    """
+    Attributes of desired that differ from current. None values in desired are left out, as in utils.build_attributes.
+    :param localized: Attributes given as a plain value for default_language or a dict per language,
+        a changed localized attribute is sent with the current languages merged with those of desired
+    """
+    localized = set(localized)
+    delta = dict()
+
+    for key, value in desired.items():
+        if value is None:
+            continue
+
+        if key in localized:
+            value = utils.get_localized_attribute(value, default_language)
+            current_value = utils.get_localized_attribute(current.get(key), default_language) or {}
+            if any(not _same(current_value.get(language), text) for language, text in value.items()):
+                delta[key] = {**current_value, **value}
+        elif not _same(current.get(key), value):
+            delta[key] = value
+
+    return delta
+
+
+class SyncReport:
+    def __init__(self):
+        self.unchanged = 0
+        self.changed: dict[tuple[str, str], dict] = dict()
+        self.missing: list[tuple[str, str]] = []
+        self.failed: dict[tuple[str, str], BatchResult] = dict()
+
+    @property
+    def updated(self) -> int:
+        return len(self.changed) - len(self.failed)
+
+    def __repr__(self):
+        return (
+            f"SyncReport(unchanged={self.unchanged}, updated={self.updated}, "
+            f"missing={len(self.missing)}, failed={len(self.failed)})"
+        )
+
+
+class CatalogSync:
+
+    """
+    Brings resources of a store to a desired state, sending only the attributes that differ.
+
+    The desired state of a resource maps item ids to attributes, e.g. built with utils.build_attributes.
+    The current state is read from the store, requesting only the attributes in the desired state,
+    or taken from the snapshot of the previous run with use_snapshot=True. Changed items are sent with update_many,
+    so through the batch endpoints by default, and unchanged items cost no requests.
+    Ids missing in the store are reported, not created. Only resources that permit updates can be synced this way.
+    Attributes are compared numerically only when the desired value is a number, so SKUs such as "001" and "1" differ.
+
+    Product tags cannot be updated, so "product_tags" is synced by sync_tags: the desired state maps product ids
+    to tag keys and values, tags that are not wanted are deleted and missing ones created with delete_many
+    and create_many. A product whose tags changed is reported as changed with the tags created and deleted.
+
+    With snapshot_path, the current state and every accepted change are saved to a JSON file after each sync
+    that is not a dry run.
+    """
+
+    def __init__(
+            self,
+            client: Client,
+            default_language: str,
+            snapshot_path: str | None = None,
+            use_batch: bool = True,
+            max_workers: int = 4
+    ):
+        self.client = client
+        self.default_language = default_language
+        self.snapshot_path = snapshot_path
+        self.use_batch = use_batch
+        self.max_workers = max_workers
+        self.snapshot: dict[str, dict[str, dict]] = dict()
+
+        if snapshot_path is not None and os.path.exists(snapshot_path):
+            with open(snapshot_path) as file:
+                self.snapshot = json.load(file)
+
+    def save_snapshot(self):
+        if self.snapshot_path is None:
+            return
+
+        utils.write_json_atomic(self.snapshot_path, self.snapshot)
+
+    def current(self, resource: str, attributes: Iterable[str], use_snapshot: bool = False) -> dict[str, dict]:
+        """
+        :param resource: Client attribute name, e.g. "products"
+        :param attributes: Attributes to read, the others are not requested
+        :return: Attributes per item id
+        """
+        if use_snapshot:
+            return self.snapshot.get(resource, {})
+
+        client_resource = getattr(self.client, resource)
+        query = Query().fields(client_resource.endpoint, sorted(attributes))
+        state = {str(item["id"]): item.get("attributes") or {} for item in client_resource.iter_all(query=query)}
+
+        self.snapshot.setdefault(resource, {}).update(state)
+        return state
+
+    def diff(
+            self,
+            resource: str,
+            desired: dict[str | int, dict],
+            localized: Iterable[str] = (),
+            use_snapshot: bool = False,
+            report: SyncReport | None = None
+    ) -> dict[str, dict]:
+        """
+        :return: The changed attributes per item id, empty items left out
+        """
+        attributes = {key for item in desired.values() for key in item}
+        current = self.current(resource, attributes, use_snapshot)
+        changes = dict()
+
+        for item_id, item in desired.items():
+            item_id = str(item_id)
+            if item_id not in current:
+                if report is not None:
+                    report.missing.append((resource, item_id))
+                continue
+
+            delta = diff_attributes(current[item_id], item, self.default_language, localized)
+            if delta:
+                changes[item_id] = delta
+            elif report is not None:
+                report.unchanged += 1
+
+        return changes
+
+    def sync(
+            self,
+            resource: str,
+            desired: dict[str | int, dict],
+            localized: Iterable[str] = (),
+            use_snapshot: bool = False,
+            dry_run: bool = False,
+            report: SyncReport | None = None
+    ) -> SyncReport:
+        """
+        :param resource: Client attribute name, e.g. "products", "product_variants" or "product_tags"
+        :param desired: Attributes per item id, or tag keys and values per product id for "product_tags"
+        :param localized: Attributes that are localized, see diff_attributes
+        :param dry_run: Only report the changes
+        """
+        if resource == TAGS:
+            return self.sync_tags(desired, use_snapshot, dry_run, report)
+
+        client_resource = getattr(self.client, resource)
+        client_resource._validate_call("update")
+
+        report = report if report is not None else SyncReport()
+        changes = self.diff(resource, desired, localized, use_snapshot, report)
+
+        for item_id, delta in changes.items():
+            report.changed[(resource, item_id)] = delta
+
+        if dry_run:
+            return report
+
+        updates = {
+            item_id: {"data": {"type": client_resource.endpoint, "id": item_id, "attributes": delta}}
+            for item_id, delta in changes.items()
+        }
+
+        snapshot = self.snapshot.setdefault(resource, {})
+        if updates:
+            for result in client_resource.update_many(updates, self.use_batch, self.max_workers):
+                if result.ok:
+                    snapshot.setdefault(result.key, {}).update(changes[result.key])
+                else:
+                    report.failed[(resource, result.key)] = result
+
+        self.save_snapshot()
+        return report
+
+    def current_tags(self, product_ids: Iterable[str | int], use_snapshot: bool = False) -> dict[str, dict]:
+        """
+        Reads the tags of the given products, filtered by product id, TAG_CHUNK_SIZE products per crawl.
+        :return: Tag id mapped to key and value, per product id
+        """
+        product_ids = [str(product_id) for product_id in product_ids]
+        if use_snapshot:
+            snapshot = self.snapshot.get(TAGS, {})
+            return {
+                product_id: {tag_id: tuple(tag) for tag_id, tag in snapshot.get(product_id, {}).items()}
+                for product_id in product_ids
+            }
+
+        resource = self.client.product_tags
+        state = {product_id: dict() for product_id in product_ids}
+
+        for i in range(0, len(product_ids), TAG_CHUNK_SIZE):
+            query = (
+                Query()
+                .fields(resource.endpoint, ["key", "value", "product"])
+                .filter("product.id", product_ids[i:i + TAG_CHUNK_SIZE], "IN")
+            )
+            for tag in resource.iter_all(query=query):
+                linkage = (tag.get("relationships") or {}).get("product", {}).get("data") or {}
+                tags = state.get(str(linkage.get("id")))
+                if tags is not None:
+                    attributes = tag.get("attributes") or {}
+                    tags[str(tag["id"])] = (attributes.get("key"), attributes.get("value"))
+
+        self.snapshot.setdefault(TAGS, {}).update(
+            {product_id: {tag_id: list(tag) for tag_id, tag in tags.items()} for product_id, tags in state.items()}
+        )
+        return state
+
+    def sync_tags(
+            self,
+            desired: dict[str | int, dict[str, str]],
+            use_snapshot: bool = False,
+            dry_run: bool = False,
+            report: SyncReport | None = None
+    ) -> SyncReport:
+        """
+        :param desired: Tag key mapped to value, per product id. Tags of the product not in desired are deleted.
+        :param dry_run: Only report the changes
+        """
+        resource = self.client.product_tags
+        resource._validate_call("create")
+        resource._validate_call("delete")
+
+        report = report if report is not None else SyncReport()
+        current = self.current_tags(desired, use_snapshot)
+        creates = []
+        deletes = []
+
+        for product_id, tags in desired.items():
+            product_id = str(product_id)
+            create, delete = diff_tags(current[product_id], tags)
+            if not create and not delete:
+                report.unchanged += 1
+                continue
+
+            report.changed[(TAGS, product_id)] = {
+                "create": create,
+                "delete": [current[product_id][tag_id] for tag_id in delete]
+            }
+            creates.extend((product_id, key, value) for key, value in create)
+            deletes.extend((product_id, tag_id) for tag_id in delete)
+
+        if dry_run:
+            return report
+
+        snapshot = self.snapshot.setdefault(TAGS, {})
+
+        # Deleted first, so a tag whose value changed never exists twice
+        if deletes:
+            results = resource.delete_many([tag_id for _, tag_id in deletes], self.use_batch, self.max_workers)
+            for (product_id, tag_id), result in zip(deletes, results):
+                if result.ok:
+                    snapshot.get(product_id, {}).pop(tag_id, None)
+                else:
+                    report.failed[(TAGS, product_id)] = result
+
+        if creates:
+            documents = [resource.tag_document(product_id, key, value) for product_id, key, value in creates]
+            results = resource.create_many(documents, self.use_batch, self.max_workers)
+            for (product_id, key, value), result in zip(creates, results):
+                data = result.body.get("data") if result.ok and isinstance(result.body, dict) else None
+                if isinstance(data, dict) and data.get("id") is not None:
+                    snapshot.setdefault(product_id, {})[str(data["id"])] = [key, value]
+                elif not result.ok:
+                    report.failed[(TAGS, product_id)] = result
+
+        self.save_snapshot()
+        return report
+
+    def sync_all(
+            self,
+            desired: dict[str, dict[str | int, dict]],
+            localized: dict[str, Iterable[str]] | None = None,
+            use_snapshot: bool = False,
+            dry_run: bool = False
+    ) -> SyncReport:
+        """
+        :param desired: Desired state per Client attribute name, e.g. {"products": {...}, "product_variants": {...}}
+        :param localized: Localized attributes per Client attribute name
+        """
+        report = SyncReport()
+        for resource, items in desired.items():
+            self.sync(resource, items, (localized or {}).get(resource, ()), use_snapshot, dry_run, report)
+        return report
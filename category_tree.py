@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+if TYPE_CHECKING:
+    from .MsConnection import Client
+    from .batch import BulkReport
+
+
+def _parent_id(category: dict) -> str | None:
+    parent = category.get('relationships', {}).get('parent', {}).get('data')
+    return None if parent is None else str(parent['id'])
+
+
+class CategoryTree:
+
+    """
+    Index over a category list, built once, with O(1) parent and children lookup and cached ancestor paths.
+    add(), move() and remove() keep it up to date when categories are created or moved.
+    All ids are strings, as in the API.
+    """
+
+    def __init__(self, categories: Iterable[dict] = ()):
+        self.categories: dict[str, dict] = dict()
+        self._parents: dict[str, str | None] = dict()
+        self._children: dict[str | None, set[str]] = {None: set()}
+        self._ancestors: dict[str, tuple[str, ...]] = dict()
+
+        for category in categories:
+            self.add(category)
+
+    @classmethod
+    def from_client(cls, client: Client) -> CategoryTree:
+        return cls(client.categories.iter_all())
+
+    def __len__(self):
+        return len(self.categories)
+
+    def __contains__(self, category_id: str | int):
+        return str(category_id) in self.categories
+
+    def add(self, category: dict):
+        """
+        Adds a new category, or replaces an existing one and moves it to its new parent.
+        """
+        category_id = str(category['id'])
+        self.categories[category_id] = category
+        self._children.setdefault(category_id, set())
+
+        if category_id in self._parents:
+            self._reparent(category_id, _parent_id(category))
+        else:
+            self._parents[category_id] = _parent_id(category)
+            self._children.setdefault(self._parents[category_id], set()).add(category_id)
+
+    def move(self, category_id: str | int, parent_id: str | int | None):
+        """
+        Moves a category under a new parent, or to the top level with parent_id None.
+        """
+        category_id = str(category_id)
+        parent_id = None if parent_id is None else str(parent_id)
+
+        if parent_id is not None and (parent_id == category_id or category_id in self.ancestors(parent_id)):
+            raise ValueError(f"Cannot move category {category_id} below itself")
+
+        self._reparent(category_id, parent_id)
+
+        # Replaced rather than changed in place, the dict may be shared with the caller
+        category = self.categories[category_id]
+        parent = {'data': None if parent_id is None else {'type': 'categories', 'id': parent_id}}
+        self.categories[category_id] = {**category, 'relationships': {**category.get('relationships', {}), 'parent': parent}}
+
+    def remove(self, category_id: str | int):
+        """
+        Removes a category. Its children move up to its parent.
+        """
+        category_id = str(category_id)
+        parent_id = self._parents[category_id]
+
+        for child_id in list(self._children[category_id]):
+            self.move(child_id, parent_id)
+
+        self._invalidate(category_id)
+        self._children[parent_id].discard(category_id)
+        del self._children[category_id]
+        del self._parents[category_id]
+        del self.categories[category_id]
+
+    def _reparent(self, category_id: str, parent_id: str | None):
+        self._invalidate(category_id)
+        self._children[self._parents[category_id]].discard(category_id)
+        self._parents[category_id] = parent_id
+        self._children.setdefault(parent_id, set()).add(category_id)
+
+    def _invalidate(self, category_id: str):
+        self._ancestors.pop(category_id, None)
+        for descendant in self.descendants(category_id):
+            self._ancestors.pop(descendant, None)
+
+    def parent(self, category_id: str | int) -> str | None:
+        return self._parents[str(category_id)]
+
+    def children(self, category_id: str | int | None) -> set[str]:
+        """
+        Direct children of a category, or the top level categories for None.
+        """
+        return set(self._children.get(None if category_id is None else str(category_id), ()))
+
+    def roots(self) -> set[str]:
+        return self.children(None)
+
+    def leaves(self) -> set[str]:
+        return {category_id for category_id in self.categories if not self._children.get(category_id)}
+
+    def ancestors(self, category_id: str | int) -> tuple[str, ...]:
+        """
+        Ids from the top level category down to the parent of category_id.
+        """
+        category_id = str(category_id)
+        ancestors = self._ancestors.get(category_id)
+
+        if ancestors is None:
+            parent_id = self._parents[category_id]
+            ancestors = () if parent_id is None or parent_id not in self._parents else (*self.ancestors(parent_id), parent_id)
+            self._ancestors[category_id] = ancestors
+
+        return ancestors
+
+    def path(self, category_id: str | int) -> tuple[str, ...]:
+        return (*self.ancestors(category_id), str(category_id))
+
+    def depth(self, category_id: str | int) -> int:
+        return len(self.ancestors(category_id))
+
+    def descendants(self, category_id: str | int) -> Iterator[str]:
+        queue = deque(self._children.get(str(category_id), ()))
+        while queue:
+            descendant = queue.popleft()
+            yield descendant
+            queue.extend(self._children.get(descendant, ()))
+
+    def move_many(self, client: Client, category_ids: Iterable[str | int], parent_id: str | int | None) -> BulkReport:
+        """
+        Moves categories under parent_id on the server with one batched update, then in the tree
+        for every category the server accepted.
+        """
+        parent = None if parent_id is None else {'type': 'categories', 'id': str(parent_id)}
+        updates = {
+            str(category_id): {
+                'data': {
+                    'type': 'categories',
+                    'id': str(category_id),
+                    'relationships': {'parent': {'data': parent}}
+                }
+            }
+            for category_id in category_ids
+        }
+
+        report = client.categories.update_many(updates)
+        for result in report.succeeded:
+            self.move(result.key, parent_id)
+
+        return report
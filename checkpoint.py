@@ -0,0 +1,64 @@
+import json
+import os
+import sqlite3
+from typing import NamedTuple
+
+from . import utils
+
+
+class CheckpointState(NamedTuple):
+    endpoint: str  # First page of the crawl, a saved state is only used to resume the same crawl
+    next: str
+    emitted: int
+
+
+class FileCheckpoint:
+
+    """
+    Keeps the position of one paginated crawl in a JSON file.
+    Requestor.iter_pages saves it after each page has been consumed and clears it when the crawl is complete.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> CheckpointState | None:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path) as file:
+            return CheckpointState(**json.load(file))
+
+    def save(self, state: CheckpointState):
+        utils.write_json_atomic(self.path, state._asdict())
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class SQLiteCheckpoint:
+
+    """
+    Keeps the position of a paginated crawl as a row in an SQLite database, one row per name,
+    so many crawls can share one file.
+    """
+
+    def __init__(self, path: str, name: str):
+        self.name = name
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints (name TEXT PRIMARY KEY, endpoint TEXT, next TEXT, emitted INTEGER)"
+        )
+        self.db.commit()
+
+    def load(self) -> CheckpointState | None:
+        row = self.db.execute("SELECT endpoint, next, emitted FROM checkpoints WHERE name = ?", (self.name,)).fetchone()
+        return None if row is None else CheckpointState(*row)
+
+    def save(self, state: CheckpointState):
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)", (self.name, *state))
+
+    def clear(self):
+        with self.db:
+            self.db.execute("DELETE FROM checkpoints WHERE name = ?", (self.name,))
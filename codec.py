@@ -0,0 +1,48 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, see the "fast" extra in setup.py
+    orjson = None
+
+
+class JsonCodec:
+
+    """
+    Compact JSON encoding with the standard library. Encodes to bytes, so bodies go out without a str copy.
+    """
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+    def loads(self, data: bytes | str) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def loads(self, data: bytes | str) -> Any:
+        return orjson.loads(data)
+
+
+def get_codec(name: str | None = None) -> JsonCodec:
+    """
+    :param name: "json" or "orjson", None picks orjson when it is installed
+    """
+    if name == "orjson" or (name is None and orjson is not None):
+        if orjson is None:
+            raise ImportError("orjson is not installed, install it with 'pip install MsConnection[fast]'")
+        return OrjsonCodec()
+    if name in (None, "json"):
+        return JsonCodec()
+    raise ValueError(f"Unknown codec: {name}")
+
+
+default_codec = get_codec()
@@ -0,0 +1,131 @@
+import gzip
+import threading
+import zlib
+
+import requests
+
+
+ENCODINGS = ("gzip", "deflate")
+
+
+def body_size(body) -> int:
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode())
+    return len(body) if hasattr(body, "__len__") else 0
+
+
+def wire_size(response: requests.Response) -> int:
+    """
+    Bytes of the response body as received, before requests or aiohttp decompressed it.
+    """
+    tell = getattr(response.raw, "tell", None)
+    if tell is not None:
+        return tell()
+    if "Content-Encoding" in response.headers and "Content-Length" in response.headers:
+        return int(response.headers["Content-Length"])
+    return len(response.content)
+
+
+class Compression:
+
+    """
+    Opt-in compression of request bodies, used by Requestor when set on the Requestor or its TokenSession.
+
+    Bodies of at least min_size bytes are sent with Content-Encoding gzip or deflate.
+    An endpoint that answers 415 Unsupported Media Type to a compressed body is remembered in unsupported,
+    the body is sent again uncompressed and so are later bodies for that endpoint.
+    Responses are always negotiated: requests and aiohttp send Accept-Encoding and decompress the answer.
+    """
+
+    def __init__(self, encoding: str = "gzip", min_size: int = 1024, level: int = 6):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding: {encoding}, use one of {ENCODINGS}")
+
+        self.encoding = encoding
+        self.min_size = min_size
+        self.level = level
+        self.unsupported: set[str] = set()
+        self._lock = threading.Lock()
+
+    def compress(self, endpoint: str, data) -> tuple:
+        """
+        :return: The body to send and the headers to send with it
+        """
+        if isinstance(data, str):
+            data = data.encode()
+        if not isinstance(data, bytes) or len(data) < self.min_size or endpoint in self.unsupported:
+            return data, {}
+
+        if self.encoding == "gzip":
+            body = gzip.compress(data, compresslevel=self.level, mtime=0)
+        else:
+            body = zlib.compress(data, self.level)
+
+        return body, {"Content-Encoding": self.encoding}
+
+    def reject(self, endpoint: str):
+        with self._lock:
+            self.unsupported.add(endpoint)
+
+
+class _Transfer:
+    __slots__ = ("requests", "sent_wire", "sent_logical", "received_wire", "received_logical")
+
+    def __init__(self):
+        self.requests = 0
+        self.sent_wire = 0
+        self.sent_logical = 0
+        self.received_wire = 0
+        self.received_logical = 0
+
+    def as_dict(self) -> dict:
+        wire = self.sent_wire + self.received_wire
+        logical = self.sent_logical + self.received_logical
+        return {
+            "requests": self.requests,
+            "sent_wire": self.sent_wire,
+            "sent_logical": self.sent_logical,
+            "received_wire": self.received_wire,
+            "received_logical": self.received_logical,
+            "saved": 1 - wire / logical if logical else 0.0,
+        }
+
+
+class TransferStats:
+
+    """
+    Bytes sent and received per endpoint, as they went over the wire and before compression (logical).
+    saved is the share of logical bytes compression kept off the wire. Responses served from the cache are not counted.
+    """
+
+    def __init__(self):
+        self.endpoints: dict[str, _Transfer] = dict()
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, data, body, response: requests.Response):
+        """
+        :param data: The request body before compression
+        :param body: The request body as sent
+        """
+        with self._lock:
+            transfer = self.endpoints.setdefault(endpoint, _Transfer())
+            transfer.requests += 1
+            transfer.sent_logical += body_size(data)
+            transfer.sent_wire += body_size(body)
+            transfer.received_logical += len(response.content)
+            transfer.received_wire += wire_size(response)
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            total = _Transfer()
+            for transfer in self.endpoints.values():
+                for counter in _Transfer.__slots__:
+                    setattr(total, counter, getattr(total, counter) + getattr(transfer, counter))
+
+            return {
+                "total": total.as_dict(),
+                "endpoints": {endpoint: transfer.as_dict() for endpoint, transfer in self.endpoints.items()},
+            }
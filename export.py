@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Iterator
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pyarrow is optional, see the "parquet" extra in setup.py
+    pyarrow = None
+
+if TYPE_CHECKING:
+    from .MsConnection import Client
+
+
+def flatten(resource: dict, prefix: str) -> dict:
+    """
+    Flattens the id and attributes of a resource into prefix.key columns, nested values become JSON strings.
+    """
+    row = {f"{prefix}.id": resource.get("id")}
+    for key, value in resource.get("attributes", {}).items():
+        row[f"{prefix}.{key}"] = json.dumps(value) if isinstance(value, (dict, list)) else value
+    return row
+
+
+class NDJSONSink:
+    def __init__(self, path: str):
+        self.file = open(path, "w", encoding="utf-8")
+
+    def write(self, row: dict):
+        self.file.write(json.dumps(row, ensure_ascii=False))
+        self.file.write("\n")
+
+    def close(self):
+        self.file.close()
+
+
+def _check_columns(row: dict, fieldnames: list[str]):
+    unknown = [key for key in row if key not in fieldnames]
+    if unknown:
+        raise ValueError(f"Row has columns that are not in fieldnames: {', '.join(unknown)}")
+
+
+class RowSpool:
+
+    """
+    Rows kept in a temporary NDJSON file while the union of their columns is collected, in order of appearance.
+    Used by the sinks that need every column before the first row is written.
+    """
+
+    def __init__(self):
+        self.file = tempfile.TemporaryFile("w+", encoding="utf-8")
+        self.columns: dict[str, None] = dict()
+
+    def write(self, row: dict):
+        self.columns.update(dict.fromkeys(row))
+        self.file.write(json.dumps(row, ensure_ascii=False))
+        self.file.write("\n")
+
+    def rows(self) -> Iterator[dict]:
+        self.file.seek(0)
+        for line in self.file:
+            yield json.loads(line)
+
+    def close(self):
+        self.file.close()
+
+
+class CSVSink:
+
+    """
+    Writes rows as CSV. Without fieldnames the rows are spooled to a temporary file and written on close,
+    with a column for every key of any row. With fieldnames, a row with other keys raises ValueError.
+    """
+
+    def __init__(self, path: str, fieldnames: list[str] | None = None):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.fieldnames = fieldnames
+        self.spool = RowSpool() if fieldnames is None else None
+        self.writer = None
+
+    def write(self, row: dict):
+        if self.spool is not None:
+            self.spool.write(row)
+            return
+
+        if self.writer is None:
+            self.writer = csv.DictWriter(self.file, self.fieldnames)
+            self.writer.writeheader()
+        self.writer.writerow(row)
+
+    def close(self):
+        try:
+            if self.spool is not None and self.spool.columns:
+                writer = csv.DictWriter(self.file, list(self.spool.columns))
+                writer.writeheader()
+                writer.writerows(self.spool.rows())
+        finally:
+            if self.spool is not None:
+                self.spool.close()
+            self.file.close()
+
+
+class ParquetSink:
+
+    """
+    Writes rows to Parquet, one row group per batch_size rows. Requires pyarrow.
+    All columns are stored as strings. Without fieldnames the rows are spooled to a temporary file and written on close,
+    with a column for every key of any row. With fieldnames, a row with other keys raises ValueError.
+    """
+
+    def __init__(self, path: str, fieldnames: list[str] | None = None, batch_size: int = 10_000):
+        if pyarrow is None:
+            raise ImportError("ParquetSink requires pyarrow, install it with 'pip install MsConnection[parquet]'")
+
+        self.path = path
+        self.fieldnames = fieldnames
+        self.batch_size = batch_size
+        self.spool = RowSpool() if fieldnames is None else None
+        self.rows = []
+        self.writer = None
+
+    def write(self, row: dict):
+        if self.spool is not None:
+            self.spool.write(row)
+            return
+
+        _check_columns(row, self.fieldnames)
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+
+        if self.writer is None:
+            schema = pyarrow.schema([(name, pyarrow.string()) for name in self.fieldnames])
+            self.writer = pyarrow.parquet.ParquetWriter(self.path, schema)
+
+        columns = {
+            name: [None if row.get(name) is None else str(row[name]) for row in self.rows]
+            for name in self.fieldnames
+        }
+        self.writer.write_table(pyarrow.table(columns, schema=self.writer.schema))
+        self.rows = []
+
+    def close(self):
+        try:
+            if self.spool is not None:
+                self.fieldnames = list(self.spool.columns)
+                for row in self.spool.rows():
+                    self.rows.append(row)
+                    if len(self.rows) >= self.batch_size:
+                        self.flush()
+            self.flush()
+        finally:
+            if self.spool is not None:
+                self.spool.close()
+            if self.writer is not None:
+                self.writer.close()
+
+
+def get_sink(path: str, export_format: str | None = None):
+    """
+    :param export_format: "ndjson", "csv" or "parquet", defaults to the file extension of path
+    """
+    export_format = export_format or path.rsplit(".", 1)[-1]
+    sinks = {"ndjson": NDJSONSink, "jsonl": NDJSONSink, "csv": CSVSink, "parquet": ParquetSink}
+
+    if export_format not in sinks:
+        raise ValueError(f"Unknown export format: {export_format}")
+
+    return sinks[export_format](path)
+
+
+class ExportReport:
+    def __init__(self):
+        self.orders = 0
+        self.rows = 0
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return f"ExportReport(orders={self.orders}, rows={self.rows}, {self.rows_per_second:.1f} rows/s)"
+
+
+class OrderExporter:
+
+    """
+    Streams orders to a sink as flat rows, one row per order product.
+
+    Orders are read page by page. For the orders of a page, the order products, totals and status history
+    are fetched on max_workers threads, and the rows are written before the next page is read,
+    so memory use does not grow with the number of orders. Totals and status history are stored
+    as JSON strings in the order_totals and order_status_history columns.
+    """
+
+    def __init__(self, client: Client, sink, max_workers: int = 8, endpoint: str | None = None):
+        self.client = client
+        self.sink = sink
+        self.max_workers = max_workers
+        self.endpoint = endpoint
+
+    def _fetch(self, order: dict) -> tuple[dict, list, list, list]:
+        orders = self.client.orders
+        order_id = order["id"]
+        return (
+            order,
+            orders.order_products(order_id),
+            orders.order_totals(order_id),
+            orders.order_status_history(order_id)
+        )
+
+    @staticmethod
+    def rows(order: dict, products: list, totals: list, history: list) -> Iterator[dict]:
+        base = flatten(order, "order")
+        base["order_totals"] = json.dumps([flatten(total, "total") for total in totals])
+        base["order_status_history"] = json.dumps([flatten(status, "status") for status in history])
+
+        if not products:
+            yield base
+
+        for product in products:
+            yield {**base, **flatten(product, "product")}
+
+    def run(self, progress_every: int = 0) -> ExportReport:
+        """
+        Exports every order and closes the sink.
+        :param progress_every: Log rows/s after every n orders, 0 to stay quiet
+        """
+        report = ExportReport()
+        start = time.monotonic()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for page in self.client.orders.iter_pages(self.endpoint):
+                    for fetched in executor.map(self._fetch, page.data):
+                        for row in self.rows(*fetched):
+                            self.sink.write(row)
+                            report.rows += 1
+
+                        report.orders += 1
+                        if progress_every and report.orders % progress_every == 0:
+                            report.seconds = time.monotonic() - start
+                            logging.info(report)
+        finally:
+            report.seconds = time.monotonic() - start
+            self.sink.close()
+
+        return report
+
+
+def export_orders(client: Client, path: str, export_format: str | None = None, max_workers: int = 8) -> ExportReport:
+    return OrderExporter(client, get_sink(path, export_format), max_workers).run()
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from typing import TYPE_CHECKING, Iterable, NamedTuple
+from urllib.parse import urlparse
+
+import requests
+
+from .MsExceptions import MsExceptions
+from .batch import BatchBuilder
+from .query import Query
+
+if TYPE_CHECKING:
+    from .MsConnection import Client
+
+
+# Indexed resource types, mapped to their Client attribute
+DEFAULT_RESOURCES = {
+    "products": "products",
+    "product-variants": "product_variants",
+}
+
+DEFAULT_FIELDS = ("sku", "model", "ean")
+
+
+class LookupEntry(NamedTuple):
+    resource_type: str
+    id: str
+
+
+def _resource_path(url: str) -> list[str]:
+    """
+    Path segments of a URL or batch operation url after shops/{store}, e.g. ["products", "1"]
+    """
+    parts = urlparse(url).path.strip("/").split("/")
+    return parts[2:] if parts[0] == "shops" else parts
+
+
+class LookupIndex:
+
+    """
+    Local index from SKU, model and EAN to the id of a product or product variant, persisted in SQLite.
+
+    refresh() crawls the indexed resources, requesting only the indexed fields. After the first refresh only items
+    whose date_attribute is at or after the persisted high-water mark are requested, plus items marked stale.
+    The high-water mark is only saved once a crawl has completed, since pages are not ordered by date.
+    A full refresh indexes over the existing entries, which stay available during the crawl,
+    and drops the entries it did not see only after the crawl has completed.
+    Lookups are served from memory without API calls.
+
+    The index listens to the writes of the client's Requestor: items created or updated through the client are
+    indexed from the response, or marked stale when the response has no attributes, and deleted items are removed.
+    Items deleted outside the client are only dropped by refresh(full=True).
+    """
+
+    def __init__(
+            self,
+            client: Client,
+            path: str,
+            fields: Iterable[str] = DEFAULT_FIELDS,
+            resources: dict[str, str] | None = None,
+            date_attribute: str = "updated_at"
+    ):
+        self.client = client
+        self.fields = tuple(fields)
+        self.resources = resources if resources is not None else DEFAULT_RESOURCES
+        self.date_attribute = date_attribute
+        self._lock = threading.Lock()
+
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS lookup ("
+            "field TEXT, value TEXT, resource_type TEXT, id TEXT, PRIMARY KEY (field, value))"
+        )
+        self.db.execute("CREATE TABLE IF NOT EXISTS lookup_state (resource_type TEXT PRIMARY KEY, high_water TEXT)")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS lookup_stale (resource_type TEXT, id TEXT, PRIMARY KEY (resource_type, id))"
+        )
+        self.db.commit()
+
+        self._entries: dict[tuple[str, str], LookupEntry] = dict()
+        self._keys: dict[LookupEntry, set[tuple[str, str]]] = dict()
+        rows = self.db.execute("SELECT field, value, resource_type, id FROM lookup")
+        for field, value, resource_type, item_id in rows:
+            entry = LookupEntry(resource_type, item_id)
+            self._entries[(field, value)] = entry
+            self._keys.setdefault(entry, set()).add((field, value))
+
+        client._r.write_listeners.append(self.on_write)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, field: str, value: str | int) -> LookupEntry | None:
+        return self._entries.get((field, str(value)))
+
+    def find(self, value: str | int) -> LookupEntry | None:
+        """
+        Looks value up in every indexed field, in the order of fields.
+        """
+        for field in self.fields:
+            entry = self._entries.get((field, str(value)))
+            if entry is not None:
+                return entry
+        return None
+
+    def sku(self, value: str) -> LookupEntry | None:
+        return self.get("sku", value)
+
+    def model(self, value: str) -> LookupEntry | None:
+        return self.get("model", value)
+
+    def ean(self, value: str | int) -> LookupEntry | None:
+        return self.get("ean", value)
+
+    @property
+    def stale(self) -> list[LookupEntry]:
+        with self._lock:
+            return [LookupEntry(*row) for row in self.db.execute("SELECT resource_type, id FROM lookup_stale")]
+
+    def _remove(self, entry: LookupEntry):
+        for key in self._keys.pop(entry, ()):
+            if self._entries.get(key) == entry:
+                del self._entries[key]
+        self.db.execute("DELETE FROM lookup WHERE resource_type = ? AND id = ?", entry)
+        self.db.execute("DELETE FROM lookup_stale WHERE resource_type = ? AND id = ?", entry)
+
+    def _index(self, resource_type: str, item: dict):
+        entry = LookupEntry(resource_type, str(item["id"]))
+        self._remove(entry)
+
+        attributes = item.get("attributes") or {}
+        keys = {(field, str(attributes[field])) for field in self.fields if attributes.get(field) not in (None, "")}
+        for key in keys:
+            old = self._entries.get(key)
+            if old is not None and old != entry:
+                self._keys[old].discard(key)
+            self._entries[key] = entry
+
+        self._keys[entry] = keys
+        self.db.executemany("INSERT OR REPLACE INTO lookup VALUES (?, ?, ?, ?)", [(*key, *entry) for key in keys])
+
+    def _mark_stale(self, entry: LookupEntry):
+        self._remove(entry)
+        self.db.execute("INSERT OR REPLACE INTO lookup_stale VALUES (?, ?)", entry)
+
+    def _apply(self, method: str, url: str, document):
+        path = _resource_path(url)
+        if path[0] not in self.resources or len(path) > 2:
+            return
+
+        data = document.get("data") if isinstance(document, dict) else None
+        if method == "DELETE" and len(path) == 2:
+            self._remove(LookupEntry(path[0], path[1]))
+        elif isinstance(data, dict) and data.get("id") is not None and "attributes" in data:
+            self._index(path[0], data)
+        elif len(path) == 2:
+            self._mark_stale(LookupEntry(path[0], path[1]))
+
+    def _decode(self, body):
+        try:
+            return self.client._r.codec.loads(body)
+        except (TypeError, ValueError):
+            return None
+
+    def on_write(self, method: str, url: str, data, response: requests.Response):
+        """
+        Write listener of the client's Requestor, batch writes are applied per operation.
+        """
+        document = self._decode(response.content)
+
+        with self._lock, self.db:
+            if _resource_path(url)[0] not in ("atomic-batch", "non-atomic-batch"):
+                self._apply(method, url, document)
+                return
+
+            request = self._decode(data)
+            operations = request.get(BatchBuilder.operations_key, []) if isinstance(request, dict) else []
+            results = document.get(BatchBuilder.results_key, []) if isinstance(document, dict) else []
+
+            for i, operation in enumerate(operations):
+                result = results[i] if i < len(results) else None
+                if isinstance(result, dict) and (result.get("status") or 0) >= 400:
+                    continue
+                body = result.get("body", result) if isinstance(result, dict) else None
+                self._apply(operation.get("method", ""), operation.get("url", ""), body)
+
+    def high_water(self, resource_type: str) -> str | None:
+        row = self.db.execute(
+            "SELECT high_water FROM lookup_state WHERE resource_type = ?", (resource_type,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def refresh(self, full: bool = False) -> int:
+        """
+        Brings the index up to date.
+        :param full: Rebuild from a complete crawl, also dropping items deleted outside the client
+        :return: Number of items indexed
+        """
+        indexed = 0
+        for resource_type, attribute in self.resources.items():
+            resource = getattr(self.client, attribute)
+            fields = [*self.fields, self.date_attribute]
+            high_water = None if full else self.high_water(resource_type)
+
+            query = Query().fields(resource_type, fields)
+            if high_water is not None:
+                query = query.filter(self.date_attribute, high_water, ">=")
+
+            crawled = set()
+            for page in resource.iter_pages(query=query):
+                with self._lock, self.db:
+                    for item in page.data:
+                        self._index(resource_type, item)
+                        crawled.add(LookupEntry(resource_type, str(item["id"])))
+                        updated = (item.get("attributes") or {}).get(self.date_attribute)
+                        if updated is not None and (high_water is None or updated > high_water):
+                            high_water = updated
+                indexed += len(page.data)
+
+            with self._lock, self.db:
+                if full or self.high_water(resource_type) is None:
+                    for entry in [e for e in self._keys if e.resource_type == resource_type and e not in crawled]:
+                        self._remove(entry)
+                self.db.execute("INSERT OR REPLACE INTO lookup_state VALUES (?, ?)", (resource_type, high_water))
+
+            for entry in [entry for entry in self.stale if entry.resource_type == resource_type]:
+                try:
+                    item = resource.get(entry.id, fields=fields)
+                except MsExceptions.ResponseError as e:
+                    if e.status_code != 404:
+                        raise
+                    item = None
+
+                with self._lock, self.db:
+                    if item is None:
+                        self._remove(entry)
+                    else:
+                        self._index(resource_type, item)
+                        indexed += 1
+
+        return indexed
+
+    def close(self):
+        self.client._r.write_listeners.remove(self.on_write)
+        self.db.close()
@@ -0,0 +1,103 @@
+import json
+import sqlite3
+import time
+from typing import Iterator
+
+from . import utils
+from .MsConnection import Client
+from .query import Query
+
+
+# Resources mirrored by default, mapped to the date attribute used for incremental refreshes
+DEFAULT_RESOURCES = {
+    "products": "updated_at",
+    "product_variants": "updated_at",
+    "categories": "updated_at",
+    "orders": "updated_at",
+    "order_products": "updated_at",
+    "customers": "updated_at",
+}
+
+
+class Mirror:
+
+    """
+    Local SQLite copy of selected resources of one store.
+
+    The first sync of a resource loads it completely, later syncs only request items whose date attribute
+    is at or after the high-water mark persisted by the previous sync, so items updated in the same second as the mark
+    are not missed. Writes are upserts, so items at the mark are simply written again.
+    Deleted items are only dropped by a full sync.
+    Documents are stored as JSON, so they can be queried with SQLite's json_extract().
+    """
+
+    def __init__(self, client: Client, path: str, resources: dict[str, str] | None = None):
+        self.client = client
+        self.resources = resources if resources is not None else DEFAULT_RESOURCES
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS resources ("
+            "resource TEXT, id TEXT, updated TEXT, document TEXT, PRIMARY KEY (resource, id))"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS sync_state (resource TEXT PRIMARY KEY, high_water TEXT, synced_at REAL)"
+        )
+        self.db.commit()
+
+    def high_water(self, resource: str) -> str | None:
+        row = self.db.execute("SELECT high_water FROM sync_state WHERE resource = ?", (resource,)).fetchone()
+        return None if row is None else row[0]
+
+    def sync(self, resource: str, full: bool = False) -> int:
+        """
+        Brings one resource up to date.
+        :param resource: Client attribute name, e.g. "products"
+        :param full: Reload everything, also dropping items deleted on the server
+        :return: Number of items written
+        """
+        date_attribute = self.resources[resource]
+        client_resource = getattr(self.client, resource)
+        high_water = None if full else self.high_water(resource)
+
+        query = None if high_water is None else Query().filter(date_attribute, high_water, ">=")
+
+        written = 0
+        with self.db:
+            if high_water is None:
+                self.db.execute("DELETE FROM resources WHERE resource = ?", (resource,))
+
+            for page in client_resource.iter_pages(query=query):
+                rows = []
+                for item in page.data:
+                    updated = utils.convert_if_datetime(item.get("attributes", {}).get(date_attribute))
+                    rows.append((resource, item["id"], updated, json.dumps(item)))
+                    if updated is not None and (high_water is None or updated > high_water):
+                        high_water = updated
+
+                self.db.executemany("INSERT OR REPLACE INTO resources VALUES (?, ?, ?, ?)", rows)
+                written += len(rows)
+
+            self.db.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)", (resource, high_water, time.time())
+            )
+
+        return written
+
+    def sync_all(self, full: bool = False) -> dict[str, int]:
+        return {resource: self.sync(resource, full) for resource in self.resources}
+
+    def get(self, resource: str, item_id: str | int) -> dict | None:
+        row = self.db.execute(
+            "SELECT document FROM resources WHERE resource = ? AND id = ?", (resource, str(item_id))
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def all(self, resource: str) -> Iterator[dict]:
+        for (document,) in self.db.execute("SELECT document FROM resources WHERE resource = ?", (resource,)):
+            yield json.loads(document)
+
+    def query(self, sql: str, parameters: tuple | dict = ()) -> list:
+        return self.db.execute(sql, parameters).fetchall()
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,136 @@
+import sys
+from typing import Iterator
+
+from .MsConnection import RESOURCES, BaseClient
+from .session import Page
+
+
+class Model:
+
+    """
+    Slot-based resource object. The JSON:API type is a class attribute, ids and attribute names are interned,
+    and relationships point at other Model objects of the same IdentityMap instead of nested identifier dicts.
+    Attributes are readable as model.name as well as model.attributes["name"].
+    """
+
+    __slots__ = ("id", "attributes", "relationships", "__weakref__")
+    type: str = None
+
+    def __init__(self, item_id: str):
+        self.id = item_id
+        self.attributes = {}
+        self.relationships = {}
+
+    def __getattr__(self, name: str):
+        if name == "attributes":
+            raise AttributeError(name)
+        try:
+            return self.attributes[name]
+        except KeyError:
+            raise AttributeError(f"{self.type} has no attribute {name!r}") from None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(id={self.id!r})"
+
+    def to_dict(self) -> dict:
+        """
+        Converts the model back to a JSON:API resource object.
+        """
+        relationships = dict()
+        for name, related in self.relationships.items():
+            if isinstance(related, tuple):
+                relationships[name] = {"data": [{"type": model.type, "id": model.id} for model in related]}
+            else:
+                relationships[name] = {"data": None if related is None else {"type": related.type, "id": related.id}}
+
+        return {"type": self.type, "id": self.id, "attributes": dict(self.attributes), "relationships": relationships}
+
+
+def _model_class(resource_type: str, name: str) -> type:
+    return type(name, (Model,), {"__slots__": (), "type": sys.intern(resource_type)})
+
+
+# JSON:API type mapped to its model class, one per resource defined in MsConnection.py
+MODELS = {
+    resource.endpoint: _model_class(resource.endpoint, f"{resource.__name__}Model")
+    for resource in RESOURCES.values()
+    if resource.vnd
+}
+
+
+class IdentityMap:
+
+    """
+    Turns JSON:API resources into Model objects, keeping exactly one object per type and id.
+    A resource referenced before it is loaded gets an empty placeholder, filled in when the resource itself arrives.
+    """
+
+    def __init__(self):
+        self._models: dict[tuple[str, str], Model] = dict()
+
+    def __len__(self):
+        return len(self._models)
+
+    def __contains__(self, key: tuple[str, str]):
+        return key in self._models
+
+    def get(self, resource_type: str, item_id: str | int) -> Model | None:
+        return self._models.get((resource_type, str(item_id)))
+
+    def ref(self, resource_type: str, item_id: str | int) -> Model:
+        """
+        Returns the model for type and id, creating an empty one if it has not been seen.
+        """
+        key = (resource_type, str(item_id))
+        model = self._models.get(key)
+
+        if model is None:
+            model_class = MODELS.get(resource_type)
+            if model_class is None:
+                name = "".join(part.title() for part in resource_type.split("-"))
+                model_class = MODELS[resource_type] = _model_class(resource_type, f"{name}Model")
+            model = self._models[key] = model_class(sys.intern(key[1]))
+
+        return model
+
+    def _resolve(self, linkage: dict | list | None) -> Model | tuple | None:
+        if linkage is None:
+            return None
+        if isinstance(linkage, list):
+            return tuple(self.ref(identifier["type"], identifier["id"]) for identifier in linkage)
+        return self.ref(linkage["type"], linkage["id"])
+
+    def load(self, resource: dict) -> Model:
+        model = self.ref(resource["type"], resource["id"])
+        model.attributes = {sys.intern(key): value for key, value in resource.get("attributes", {}).items()}
+
+        for name, relationship in resource.get("relationships", {}).items():
+            if "data" in relationship:
+                model.relationships[sys.intern(name)] = self._resolve(relationship["data"])
+
+        return model
+
+    def load_page(self, page: Page) -> list[Model]:
+        for resource in page.included:
+            self.load(resource)
+        return [self.load(resource) for resource in page.data]
+
+    def load_document(self, document: dict) -> Model | list[Model]:
+        for resource in document.get("included", []):
+            self.load(resource)
+
+        data = document["data"]
+        return [self.load(resource) for resource in data] if isinstance(data, list) else self.load(data)
+
+    def iter_all(
+            self,
+            resource: BaseClient,
+            endpoint: str | None = None,
+            fields: dict | list | str | None = None,
+            include: list | str | None = None
+    ) -> Iterator[Model]:
+        """
+        Crawls a resource like BaseClient.iter_all, yielding models instead of dicts.
+        """
+        for page in resource.iter_pages(endpoint, fields, include):
+            yield from self.load_page(page)
@@ -0,0 +1,138 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, Iterator, NamedTuple
+
+from .MsConnection import Client
+from .ratelimit import RateLimiter, StackedRateLimiter
+from .session import Requestor, TokenSession
+
+
+class StoreResult(NamedTuple):
+    store: str
+    result: Any
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+_DONE = object()
+
+
+class MultiStoreClient:
+
+    """
+    Runs the same operation against many stores concurrently.
+
+    Every store gets its own Client with an independent rate budget (requests_per_second and burst),
+    stacked on top of the session's rate_limiter, which acts as the budget shared by all stores.
+    All stores use the connection pool of the one session, so its pool_maxsize should be at least max_workers.
+    Stores are given as names, or as a dict of store name to API token when each store has its own token.
+
+    A failing store is reported as a StoreResult with error set and does not affect the other stores.
+    """
+
+    def __init__(
+            self,
+            session: TokenSession,
+            stores: Iterable[str] | dict[str, str],
+            requests_per_second: float = 5.0,
+            burst: int | None = None,
+            max_workers: int = 16
+    ):
+        self.session = session
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.max_workers = max_workers
+        tokens = stores if isinstance(stores, dict) else {store: None for store in stores}
+        self.clients = {store: self._client(store, token) for store, token in tokens.items()}
+
+    def _client(self, store: str, token: str | None) -> Client:
+        limiters = [RateLimiter(self.requests_per_second, self.burst)]
+        if getattr(self.session, "rate_limiter", None) is not None:
+            limiters.append(self.session.rate_limiter)
+
+        headers = None if token is None else {"Authorization": f"Bearer {token}"}
+        requestor = Requestor(self.session, store, rate_limiter=StackedRateLimiter(limiters), headers=headers)
+        return Client(self.session, store, requestor)
+
+    def __getitem__(self, store: str) -> Client:
+        return self.clients[store]
+
+    def __iter__(self):
+        return iter(self.clients)
+
+    def __len__(self):
+        return len(self.clients)
+
+    def map(self, operation: Callable[[Client], Any], stores: Iterable[str] | None = None) -> Iterator[StoreResult]:
+        """
+        Calls operation(client) for every store, yielding results as each store finishes.
+        :param operation: E.g. lambda client: client.orders.all()
+        :param stores: Subset of stores, defaults to all
+        """
+        stores = list(self.clients if stores is None else stores)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+        try:
+            futures = {executor.submit(operation, self.clients[store]): store for store in stores}
+            for future in as_completed(futures):
+                store = futures[future]
+                try:
+                    yield StoreResult(store, future.result())
+                except Exception as e:
+                    yield StoreResult(store, None, e)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stream(
+            self,
+            operation: Callable[[Client], Iterable],
+            stores: Iterable[str] | None = None,
+            buffer: int = 1000
+    ) -> Iterator[StoreResult]:
+        """
+        Like map(), for operations returning an iterable, e.g. lambda client: client.orders.iter_all().
+        Yields one StoreResult per item as soon as any store produces it, with at most buffer items waiting.
+        A store that fails part way yields one StoreResult with error set after the items it did produce.
+        """
+        stores = list(self.clients if stores is None else stores)
+        results = queue.Queue(maxsize=buffer)
+        stop = threading.Event()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def run(store: str):
+            try:
+                for item in operation(self.clients[store]):
+                    if not put(StoreResult(store, item)):
+                        return
+            except Exception as e:
+                put(StoreResult(store, None, e))
+            finally:
+                put(_DONE)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            for store in stores:
+                executor.submit(run, store)
+
+            remaining = len(stores)
+            while remaining:
+                item = results.get()
+                if item is _DONE:
+                    remaining -= 1
+                else:
+                    yield item
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterator
+
+from . import utils
+from .query import Query
+
+if TYPE_CHECKING:
+    from .MsConnection import BaseClient, Client
+
+
+class DeltaPoller:
+
+    """
+    Yields the items of a resource created or changed since the previous poll, each change exactly once.
+
+    Every poll only pages through items whose date_attribute is >= the persisted high-water mark.
+    Items at exactly the high-water mark that were already yielded are remembered by id and skipped.
+    Items yielded by a poll that did not finish are remembered with their date,
+    so a restarted poll does not yield them again unless they changed in the meantime.
+    An item counts as delivered as soon as it is yielded. Delivered items are appended to a journal next to
+    state_path after every page and when the caller stops iterating early, so a crash loses at most the items
+    of one page. The state file itself is only rewritten when a poll completes, which folds the journal in.
+    """
+
+    def __init__(
+            self,
+            resource: BaseClient,
+            state_path: str,
+            date_attribute: str = "updated_at",
+            since: datetime | str | None = None
+    ):
+        self.resource = resource
+        self.state_path = state_path
+        self.journal_path = f"{state_path}.log"
+        self.date_attribute = date_attribute
+        self.since = utils.convert_if_datetime(since)
+
+    def load_state(self) -> tuple[str | None, set, dict]:
+        """
+        :return: High-water mark, ids seen at the high-water mark, and ids yielded by an unfinished poll
+        """
+        high_water, seen, pending = self.since, set(), dict()
+
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as file:
+                state = json.load(file)
+            high_water, seen, pending = state["high_water"], set(state["seen"]), state["pending"]
+
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path) as file:
+                for line in file:
+                    try:
+                        item_id, date = json.loads(line)
+                    except ValueError:  # The last line of a journal cut off by a crash
+                        break
+                    pending[item_id] = date
+
+        return high_water, seen, pending
+
+    def save_state(self, high_water: str | None, seen: set, pending: dict):
+        utils.write_json_atomic(self.state_path, {"high_water": high_water, "seen": sorted(seen), "pending": pending})
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def _journal(self, delivered: dict):
+        if not delivered:
+            return
+
+        with open(self.journal_path, "a") as file:
+            file.writelines(f"{json.dumps([item_id, date])}\n" for item_id, date in delivered.items())
+        delivered.clear()
+
+    def poll(self) -> Iterator[dict]:
+        high_water, seen, pending = self.load_state()
+
+        query = None if high_water is None else Query().filter(self.date_attribute, high_water, ">=")
+
+        delivered = dict()
+        try:
+            for page in self.resource.iter_pages(query=query):
+                for item in page.data:
+                    item_id = item["id"]
+                    date = utils.convert_if_datetime(item.get("attributes", {}).get(self.date_attribute))
+
+                    if date is None or pending.get(item_id) == date:
+                        continue
+                    if high_water is not None and (date < high_water or (date == high_water and item_id in seen)):
+                        continue
+
+                    pending[item_id] = delivered[item_id] = date
+                    yield item
+
+                self._journal(delivered)
+        finally:
+            self._journal(delivered)
+
+        if pending:
+            new_high_water = max(pending.values())
+            new_seen = {item_id for item_id, date in pending.items() if date == new_high_water}
+            if new_high_water == high_water:
+                new_seen |= seen
+            self.save_state(new_high_water, new_seen, dict())
+
+    def watch(self, interval: float = 60.0) -> Iterator[dict]:
+        """
+        Polls forever, sleeping interval seconds between polls.
+        """
+        while True:
+            yield from self.poll()
+            time.sleep(interval)
+
+
+class OrderPoller(DeltaPoller):
+    def __init__(
+            self,
+            client: Client,
+            state_path: str,
+            date_attribute: str = "updated_at",
+            since: datetime | str | None = None
+    ):
+        super().__init__(client.orders, state_path, date_attribute, since)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterable, NamedTuple
+
+from . import utils
+
+
+OPERATORS = (
+    "=", "<>", ">", ">=", "<", "<=",
+    "STARTS_WITH", "CONTAINS", "ENDS_WITH",
+    "IN", "NOT IN", "BETWEEN", "NOT BETWEEN",
+    "IS NULL", "IS NOT NULL",
+)
+
+
+class Filter(NamedTuple):
+    name: str  # Unique key of the condition in the query, the attribute unless it is filtered on more than once
+    path: str
+    value: str | list | None
+    operator: str
+
+
+class Query:
+
+    """
+    Filters, sort order, page size, sparse fieldsets and includes for the read methods of BaseClient.
+    Every method returns a new Query, so a base query can be shared and extended:
+
+        pending = Query().filter("status", "pending").sort("-created_at").page_size(100)
+        client.orders.all(query=pending.filter("created_at", since, ">="))
+
+    Filters are sent as filter[name][path], filter[name][value] and, for operators other than "=",
+    filter[name][operator]. List values are sent as filter[name][value][0], filter[name][value][1] and so on.
+    """
+
+    def __init__(self):
+        self.filters: tuple[Filter, ...] = ()
+        self.sorting: tuple[str, ...] = ()
+        self.size: int | None = None
+        self.sparse_fields: dict[str, tuple[str, ...]] = dict()
+        self.includes: tuple[str, ...] = ()
+
+    def _copy(self) -> Query:
+        query = Query()
+        query.filters = self.filters
+        query.sorting = self.sorting
+        query.size = self.size
+        query.sparse_fields = dict(self.sparse_fields)
+        query.includes = self.includes
+        return query
+
+    def filter(
+            self,
+            attribute: str,
+            value: str | int | float | datetime | Iterable | None = None,
+            operator: str = "="
+    ) -> Query:
+        """
+        :param attribute: Attribute path, e.g. "status" or "customer.id"
+        :param value: Compared value, a list for IN, NOT IN, BETWEEN and NOT BETWEEN, None for IS NULL and IS NOT NULL
+        :param operator: One of OPERATORS
+        """
+        operator = operator.upper()
+        if operator not in OPERATORS:
+            raise ValueError(f"Unknown filter operator: {operator}")
+
+        if isinstance(value, (list, tuple, set)):
+            value = [str(utils.convert_if_datetime(item)) for item in value]
+        elif value is not None:
+            value = str(utils.convert_if_datetime(value))
+
+        names = {condition.name for condition in self.filters}
+        name, i = attribute, 1
+        while name in names:
+            name, i = f"{attribute}-{i}", i + 1
+
+        query = self._copy()
+        query.filters = (*self.filters, Filter(name, attribute, value, operator))
+        return query
+
+    def sort(self, *attributes: str) -> Query:
+        """
+        :param attributes: Attributes to sort by, prefixed with "-" for descending order
+        """
+        query = self._copy()
+        query.sorting = (*self.sorting, *attributes)
+        return query
+
+    def page_size(self, size: int) -> Query:
+        query = self._copy()
+        query.size = size
+        return query
+
+    def fields(self, resource_type: str, fields: Iterable[str] | str) -> Query:
+        """
+        :param fields: Attributes of resource_type to return, an empty list returns only identifiers
+        """
+        query = self._copy()
+        query.sparse_fields[resource_type] = (fields,) if isinstance(fields, str) else tuple(fields)
+        return query
+
+    def include(self, *relationships: str) -> Query:
+        query = self._copy()
+        query.includes = (*self.includes, *relationships)
+        return query
+
+    def params(self) -> dict:
+        params = dict()
+
+        for condition in self.filters:
+            key = f"filter[{condition.name}]"
+            params[f"{key}[path]"] = condition.path
+            if condition.operator != "=":
+                params[f"{key}[operator]"] = condition.operator
+            if isinstance(condition.value, list):
+                for i, item in enumerate(condition.value):
+                    params[f"{key}[value][{i}]"] = item
+            elif condition.value is not None:
+                params[f"{key}[value]"] = condition.value
+
+        if self.sorting:
+            params["sort"] = ",".join(self.sorting)
+        if self.size is not None:
+            params["page[size]"] = self.size
+        for resource_type, fields in self.sparse_fields.items():
+            params[f"fields[{resource_type}]"] = ",".join(fields)
+        if self.includes:
+            params["include"] = ",".join(self.includes)
+
+        return params
+
+    def __repr__(self):
+        return f"Query({self.params()})"
@@ -0,0 +1,171 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable
+
+import requests
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parses a Retry-After header, given either as delay seconds or as an HTTP date.
+    :param value: Raw header value
+    :return: Seconds to wait, or None if the header is missing or malformed
+    """
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+def _parse_number(value: str | None) -> float | None:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class RateLimiter:
+
+    """
+    Thread safe token bucket shared by every Requestor using the same TokenSession.
+
+    Falls back to a fixed requests-per-second budget, and adapts to the server when it sends
+    X-RateLimit-Remaining / X-RateLimit-Reset headers or a Retry-After on 429 and 503 responses.
+    """
+
+    remaining_header = "X-RateLimit-Remaining"
+    reset_header = "X-RateLimit-Reset"
+
+    def __init__(
+            self,
+            requests_per_second: float = 5.0,
+            burst: int | None = None,
+            clock: Callable[[], float] = time.monotonic,
+            sleep: Callable[[float], None] = time.sleep
+    ):
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be positive")
+
+        self.rate = float(requests_per_second)
+        self.capacity = float(burst if burst is not None else max(1, int(requests_per_second)))
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._blocked_until = 0.0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _reserve(self) -> float:
+        """
+        Takes a token if one is available.
+        :return: 0 if a token was taken, otherwise the seconds to wait before trying again
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            wait = self._blocked_until - now
+
+            if wait > 0:
+                return wait
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        """
+        Blocks until a request may be sent.
+        """
+        while (wait := self._reserve()) > 0:
+            self._sleep(wait)
+
+    async def acquire_async(self):
+        """
+        Same as acquire(), but yields to the event loop while waiting.
+        """
+        while (wait := self._reserve()) > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """
+        Stops handing out tokens for the given number of seconds.
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens = 0.0
+            self._blocked_until = max(self._blocked_until, now + seconds)
+
+    def update_from_response(self, response: requests.Response):
+        headers = response.headers
+
+        if response.status_code in (429, 503):
+            retry_after = parse_retry_after(headers.get("Retry-After"))
+            if retry_after is not None:
+                self.pause(retry_after)
+            elif response.status_code == 429:
+                self.pause(1 / self.rate)
+
+        remaining = _parse_number(headers.get(self.remaining_header))
+        if remaining is None:
+            return
+
+        if remaining > 0:
+            with self._lock:
+                self._tokens = min(self._tokens, remaining)
+            return
+
+        reset = _parse_number(headers.get(self.reset_header))
+        if reset is not None:
+            # Some servers send an epoch timestamp, others the seconds left in the window
+            self.pause(reset - time.time() if reset > 1e9 else reset)
+        else:
+            self.pause(1 / self.rate)
+
+
+class StackedRateLimiter:
+
+    """
+    Combines several limiters, e.g. a per-store budget followed by a budget shared by every store.
+    A request waits for a token from each of them in order. Response headers only adjust the first limiter,
+    since rate limit headers describe the budget of the store that answered.
+    """
+
+    def __init__(self, limiters: list[RateLimiter]):
+        self.limiters = limiters
+
+    def acquire(self):
+        for limiter in self.limiters:
+            limiter.acquire()
+
+    async def acquire_async(self):
+        for limiter in self.limiters:
+            await limiter.acquire_async()
+
+    def pause(self, seconds: float):
+        self.limiters[0].pause(seconds)
+
+    def update_from_response(self, response: requests.Response):
+        self.limiters[0].update_from_response(response)
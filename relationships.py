@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+from .MsExceptions import MsExceptions
+from .query import Query
+from .session import Page
+
+if TYPE_CHECKING:
+    from .MsConnection import BaseClient
+
+
+PRODUCT_RELATIONSHIPS = ("categories", "product-variants", "product-specials", "product-properties", "product-tags")
+
+
+class RelationshipFetcher:
+
+    """
+    Fetches related resources for many items of one resource, e.g. categories and variants for a list of products.
+
+    With use_include the items are read from the collection endpoint, chunk_size ids per request filtered with
+    "id IN (...)" and include= for all relationships, following the next links of every chunk.
+    Relationships the server leaves out of a document, or all of them if it rejects the include with 400,
+    are fetched from {endpoint}/{id}/{relationship} instead, fanned out over max_workers threads.
+    A server that ignores the id filter is detected by an item that was not requested in a response,
+    the crawl of the collection then stops and the remaining relationships are fetched per id as well.
+    """
+
+    def __init__(
+            self,
+            resource: BaseClient,
+            relationships: Iterable[str],
+            use_include: bool = True,
+            max_workers: int = 8,
+            chunk_size: int = 50
+    ):
+        self.resource = resource
+        self.relationships = tuple(relationships)
+        self.use_include = use_include
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+
+    def fetch(self, item_ids: Iterable[str | int]) -> dict[str, dict[str, list]]:
+        """
+        :return: Item id mapped to relationship name mapped to the related resources
+        """
+        item_ids = [str(item_id) for item_id in item_ids]
+        result = {item_id: dict() for item_id in item_ids}
+
+        for chunk in self._chunks(item_ids):
+            try:
+                for page in self.resource.iter_pages(query=self._query(chunk)):
+                    if not self._collect(page, result, set(chunk)):
+                        self.use_include = False
+                        break
+            except MsExceptions.ResponseError as e:
+                if e.status_code != 400:
+                    raise
+                self.use_include = False
+
+        missing = self._missing(result)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for (item_id, rel), items in zip(missing, executor.map(lambda args: self._fetch_related(*args), missing)):
+                result[item_id][rel] = items
+
+        return result
+
+    def _chunks(self, item_ids: list[str]) -> Iterator[list[str]]:
+        if not self.use_include:
+            return
+        for i in range(0, len(item_ids), self.chunk_size):
+            if not self.use_include:
+                return
+            yield item_ids[i:i + self.chunk_size]
+
+    def _query(self, item_ids: list[str]) -> Query:
+        return Query().filter("id", item_ids, "IN").include(*self.relationships)
+
+    def _collect(self, page: Page, result: dict[str, dict[str, list]], requested: set[str]) -> bool:
+        """
+        Adds the relationships of the items in page that are fully present in the page's included resources.
+        :return: False if page holds an item that was not requested, i.e. the server ignored the id filter
+        """
+        included = {(item["type"], item["id"]): item for item in page.included}
+
+        for item in page.data:
+            if str(item["id"]) not in requested:
+                return False
+            related = result[str(item["id"])]
+
+            relationships = item.get("relationships", {})
+            for rel in self.relationships:
+                if "data" not in relationships.get(rel, {}):
+                    continue
+
+                linkage = relationships[rel]["data"]
+                identifiers = linkage if isinstance(linkage, list) else ([] if linkage is None else [linkage])
+                resources = [included.get((identifier["type"], identifier["id"])) for identifier in identifiers]
+
+                if None not in resources:
+                    related[rel] = resources
+
+        return True
+
+    def _missing(self, result: dict[str, dict[str, list]]) -> list[tuple[str, str]]:
+        return [(item_id, rel) for item_id, related in result.items() for rel in self.relationships if rel not in related]
+
+    def _fetch_related(self, item_id: str, rel: str) -> list:
+        return self.resource.all_items(f"{self.resource.endpoint}/{item_id}/{rel}")
+
+
+class AsyncRelationshipFetcher(RelationshipFetcher):
+
+    """
+    RelationshipFetcher for the resources of an AsyncClient. The fallback requests are gathered concurrently,
+    bounded by the max_concurrency of the AsyncRequestor instead of max_workers.
+    """
+
+    async def fetch(self, item_ids: Iterable[str | int]) -> dict[str, dict[str, list]]:
+        item_ids = [str(item_id) for item_id in item_ids]
+        result = {item_id: dict() for item_id in item_ids}
+
+        for chunk in self._chunks(item_ids):
+            try:
+                async for page in self.resource.iter_pages(query=self._query(chunk)):
+                    if not self._collect(page, result, set(chunk)):
+                        self.use_include = False
+                        break
+            except MsExceptions.ResponseError as e:
+                if e.status_code != 400:
+                    raise
+                self.use_include = False
+
+        missing = self._missing(result)
+        fetched = await asyncio.gather(*(self._fetch_related(item_id, rel) for item_id, rel in missing))
+        for (item_id, rel), items in zip(missing, fetched):
+            result[item_id][rel] = items
+
+        return result
+
+    async def _fetch_related(self, item_id: str, rel: str) -> list:
+        return await self.resource.all_items(f"{self.resource.endpoint}/{item_id}/{rel}")
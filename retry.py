@@ -0,0 +1,82 @@
+import random
+import threading
+from typing import Callable, NamedTuple
+
+import requests
+
+from .ratelimit import parse_retry_after
+
+
+class RetryEvent(NamedTuple):
+
+    """
+    Passed to RetryPolicy.on_retry before sleeping for the next attempt.
+    """
+
+    method: str
+    url: str
+    attempt: int
+    delay: float
+    status_code: int | None
+    error: Exception
+
+
+class RetryPolicy:
+
+    """
+    Decides which failed requests are sent again and how long to wait before doing so.
+
+    Only idempotent methods are retried by default, on connection errors and on the status codes in retry_statuses.
+    The wait is exponential backoff with full jitter, capped at max_backoff, unless the server sends a Retry-After.
+    on_retry is called with a RetryEvent for every retry, and the totals are kept in retries and backoff.
+    """
+
+    def __init__(
+            self,
+            max_attempts: int = 3,
+            backoff_factor: float = 0.5,
+            max_backoff: float = 30.0,
+            jitter: bool = True,
+            retry_statuses: tuple | list | set = (429, 502, 503, 504),
+            retry_methods: tuple | list | set = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE"),
+            respect_retry_after: bool = True,
+            on_retry: Callable[[RetryEvent], None] | None = None
+    ):
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_methods = frozenset(method.upper() for method in retry_methods)
+        self.respect_retry_after = respect_retry_after
+        self.on_retry = on_retry
+        self.retries = 0
+        self.backoff = 0.0
+        self._lock = threading.Lock()
+
+    def should_retry(self, method: str, attempt: int, response: requests.Response | None = None) -> bool:
+        """
+        :param method: HTTP method of the failed request
+        :param attempt: Number of attempts made so far, starting at 1
+        :param response: The failed response, or None if the request raised a connection error
+        """
+        if attempt >= self.max_attempts or method.upper() not in self.retry_methods:
+            return False
+        return response is None or response.status_code in self.retry_statuses
+
+    def get_backoff(self, attempt: int, response: requests.Response | None = None) -> float:
+        if self.respect_retry_after and response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, self.max_backoff)
+
+        backoff = min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1))
+        return random.uniform(0, backoff) if self.jitter else backoff
+
+    def record(self, event: RetryEvent):
+        with self._lock:
+            self.retries += 1
+            self.backoff += event.delay
+
+        if self.on_retry is not None:
+            self.on_retry(event)
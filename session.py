@@ -1,86 +1,335 @@
 import os
 import time
-from urllib.parse import urljoin
+from typing import Callable, Iterator, NamedTuple
+from urllib.parse import urlencode, urljoin, urlparse
 import requests
+from requests.adapters import HTTPAdapter
 import logging
-import copy
 
 from .MsExceptions import MsExceptions
+from .cache import ResponseCache
+from .checkpoint import CheckpointState, FileCheckpoint, SQLiteCheckpoint
+from .codec import JsonCodec, default_codec
+from .compression import Compression, TransferStats
+from .ratelimit import RateLimiter, StackedRateLimiter
+from .retry import RetryEvent, RetryPolicy
+from .singleflight import SingleFlight
 # from .exceptions import ApiError, ResponseError
 
 
+def add_params(path: str, params: dict | None) -> str:
+    """
+    Appends query parameters to a path that may already have a query string.
+    """
+    if not params:
+        return path
+    return f"{path}{'&' if '?' in path else '?'}{urlencode(params, safe='[],')}"
+
+
+class Page(NamedTuple):
+    """
+    One page of a paginated JSON:API response.
+    """
+
+    data: list
+    links: dict
+    meta: dict
+    included: list = []
+
+    @classmethod
+    def from_document(cls, document: dict) -> "Page":
+        return cls(document["data"], document.get("links", {}), document.get("meta", {}), document.get("included", []))
+
+    @property
+    def next(self) -> str | None:
+        return self.links.get("next")
+
+    @property
+    def total(self) -> int | None:
+        pagination = self.meta.get("pagination", {})
+        return self.meta.get("total", pagination.get("total"))
+
+
 class Requestor:
-    def __init__(self, session: requests.Session, store: str):
+    def __init__(
+            self,
+            session: requests.Session,
+            store: str,
+            rate_limiter: RateLimiter | StackedRateLimiter | None = None,
+            retry_policy: RetryPolicy | None = None,
+            cache: ResponseCache | None = None,
+            codec: JsonCodec | None = None,
+            headers: dict | None = None,
+            single_flight: SingleFlight | None = None,
+            compression: Compression | None = None
+    ):
         self.session = session
+        self.headers = headers if headers is not None else dict()
         self.base_url = f"https://api.mystore.no/shops/{store}/"
+        self.rate_limiter = rate_limiter if rate_limiter is not None else getattr(session, "rate_limiter", None)
+        self.retry_policy = retry_policy if retry_policy is not None else getattr(session, "retry_policy", None)
+        self.cache = cache if cache is not None else getattr(session, "cache", None)
+        self.codec = codec if codec is not None else getattr(session, "codec", default_codec)
+        self.single_flight = single_flight if single_flight is not None else getattr(session, "single_flight", None)
+        self.compression = compression if compression is not None else getattr(session, "compression", None)
+        self.transfer_stats: TransferStats | None = getattr(session, "transfer_stats", None)
+        # Called with (method, url, data, response) after every successful write, e.g. LookupIndex.on_write
+        self.write_listeners: list[Callable] = []
 
-    def _get_headers(self, vnd: bool, content_type: str | None):
-        session_headers = copy.copy(self.session.headers)
+    def _get_headers(self, vnd: bool, content_type: str | None, headers: dict | None = None):
+        session_headers = self.session.headers.copy()
         if not vnd:
             session_headers["Accept"] = "application/json"
             session_headers["Content-Type"] = "application/json"
         if content_type is not None:
             session_headers["Content-Type"] = content_type
+        session_headers.update(self.headers)
+        if headers:
+            session_headers.update(headers)
         return session_headers
 
+    def _url(self, path: str) -> str:
+        return urljoin(self.base_url, path) if not path.startswith("http") else path
+
+    @staticmethod
+    def _endpoint(url: str) -> str:
+        """
+        Returns the resource a URL belongs to, e.g. "products" for .../shops/{store}/products/1/categories
+        """
+        parts = urlparse(url).path.strip("/").split("/")
+        return parts[2] if parts[0] == "shops" and len(parts) > 2 else parts[0]
+
+    def _invalidate_cache(self, url: str):
+        endpoint = self._endpoint(url)
+        self.cache.invalidate(None if endpoint in ("atomic-batch", "non-atomic-batch") else endpoint)
+
+    def _after_write(self, method: str, url: str, data, response: requests.Response):
+        if self.cache is not None:
+            self._invalidate_cache(url)
+        for listener in self.write_listeners:
+            listener(method, url, data, response)
+
+    def _compress(self, endpoint: str, data) -> tuple:
+        """
+        :return: The body to send and extra headers, the body is compressed if compression is set and accepts it
+        """
+        return (data, {}) if self.compression is None else self.compression.compress(endpoint, data)
+
+    def _rejected_compression(self, endpoint: str, response: requests.Response, headers: dict) -> bool:
+        """
+        True if the server refused a compressed body, compression is then turned off for the endpoint.
+        """
+        if response.status_code != 415 or "Content-Encoding" not in headers:
+            return False
+        logging.debug(f"{endpoint} does not accept {headers['Content-Encoding']} bodies")
+        self.compression.reject(endpoint)
+        return True
+
+    def _record_transfer(self, endpoint: str, data, body, response: requests.Response):
+        if self.transfer_stats is not None:
+            self.transfer_stats.record(endpoint, data, body, response)
+
     def _request(
             self,
             method: str,
             path: str,
             vnd: bool = True,
-            data: str | None = None,
+            data: str | bytes | dict | list | None = None,
             content_type: str | None = None,
-            files: dict | None = None
+            files: dict | None = None,
+            headers: dict | None = None
     ):
 
-        url = urljoin(self.base_url, path) if not path.startswith("http") else path
+        url = self._url(path)
         logging.debug(url)
 
-        try:
-            response = self.session.request(
-                method,
-                url,
-                headers=self._get_headers(vnd, content_type),
-                data=data,
-                files=files
-            )
+        if isinstance(data, (dict, list)):
+            data = self.codec.dumps(data)
 
-        except requests.RequestException as e:
-            raise MsExceptions.ApiError(e)
-        if not response.ok:
-            raise MsExceptions.ResponseError(response)
+        endpoint = self._endpoint(url)
+        attempt = 0
+        waited = 0.0
 
-        return response
+        while True:
+            attempt += 1
+
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            body, body_headers = self._compress(endpoint, data)
+            request_headers = self._get_headers(vnd, content_type, headers)
+            request_headers.update(body_headers)
+
+            try:
+                response = self.session.request(
+                    method,
+                    url,
+                    headers=request_headers,
+                    data=body,
+                    files=files
+                )
+
+            except requests.RequestException as e:
+                response = None
+                error = MsExceptions.ApiError(e)
+
+            else:
+                self._record_transfer(endpoint, data, body, response)
+
+                if self.rate_limiter is not None:
+                    self.rate_limiter.update_from_response(response)
+
+                if self._rejected_compression(endpoint, response, body_headers):
+                    continue
+
+                if response.ok:
+                    if method != 'GET':
+                        self._after_write(method, url, data, response)
+                    return response
+
+                error = MsExceptions.ResponseError(response)
+
+            delay = self._retry_delay(method, url, attempt, waited, response, error)
+            if delay is None:
+                raise error
+
+            waited += delay
+            time.sleep(delay)
+
+    def _retry_delay(
+            self,
+            method: str,
+            url: str,
+            attempt: int,
+            waited: float,
+            response: requests.Response | None,
+            error: MsExceptions.ApiError
+    ) -> float | None:
+        """
+        Asks the retry policy whether a failed attempt should be sent again.
+        :return: Seconds to wait before the next attempt, or None if error should be raised
+        """
+        if self.retry_policy is None or not self.retry_policy.should_retry(method, attempt, response):
+            error.retries = attempt - 1
+            error.retry_wait = waited
+            return None
+
+        delay = self.retry_policy.get_backoff(attempt, response)
+        status_code = None if response is None else response.status_code
+        self.retry_policy.record(RetryEvent(method, url, attempt, delay, status_code, error))
+        return delay
+
+    def decode(self, response: requests.Response):
+        return self.codec.loads(response.content)
+
+    def get_json(self, path: str, vnd: bool = True):
+        return self.decode(self.get(path, vnd))
+
+    def _flight_key(self, url: str, vnd: bool) -> str:
+        return f"{'vnd' if vnd else 'json'} {url} {sorted(self.headers.items())}"
 
     def get(self, path: str, vnd: bool = True):
-        return self._request('GET', path, vnd=vnd)
+        """
+        GET through the single_flight, if set: identical GETs made while one is in flight wait for it
+        and share its response, each caller decodes its own copy of the body.
+        """
+        if self.single_flight is None:
+            return self._get(path, vnd)
+
+        url = self._url(path)
+        return self.single_flight.do(self._flight_key(url, vnd), lambda: self._get(url, vnd))
+
+    def _get(self, path: str, vnd: bool = True):
+        if self.cache is None:
+            return self._request('GET', path, vnd=vnd)
+
+        url = self._url(path)
+        key = f"{'vnd' if vnd else 'json'} {url}"
+        entry = self.cache.get(key)
+
+        if entry is not None and entry.fresh:
+            return entry.to_response(url)
+
+        response = self._request('GET', url, vnd=vnd, headers=None if entry is None else entry.validators)
+
+        if response.status_code == 304 and entry is not None:
+            return self.cache.revalidated(key, entry).to_response(url)
 
-    def post(self, path: str, data: str | dict, vnd: bool = True):
+        self.cache.store(key, self._endpoint(url), response)
+        return response
+
+    def post(self, path: str, data: str | bytes | dict, vnd: bool = True):
         return self._request('POST', path, vnd=vnd, data=data)
 
-    def patch(self, path: str, data: str | dict, vnd: bool = True):
+    def patch(self, path: str, data: str | bytes | dict, vnd: bool = True):
         return self._request('PATCH', path, vnd=vnd, data=data)
 
     def delete(self, path: str, vnd: bool = True):
         return self._request('DELETE', path, vnd=vnd)
 
-    def get_paginated(self, endpoint: str):
-        next_page: str | int = endpoint
-        output = list()
+    @staticmethod
+    def _resume(first_page: str, checkpoint: FileCheckpoint | SQLiteCheckpoint | None) -> tuple[str, int]:
+        """
+        :return: The page to start from and the number of items emitted before it
+        """
+        state = None if checkpoint is None else checkpoint.load()
+        if state is not None and state.endpoint == first_page:
+            logging.debug(f"Resuming {first_page} at {state.next} after {state.emitted} items")
+            return state.next, state.emitted
+        return first_page, 0
 
-        while type(next_page) is str:  # If theres no next page in the response we set next_page to int 0
-            response = self.get(next_page).json()
-            for data in response["data"]:
-                output.append(data)
-
-            if "next" in response["links"]:
-                next_page = response["links"]["next"]
+    @staticmethod
+    def _save_checkpoint(
+            first_page: str,
+            page: Page,
+            emitted: int,
+            checkpoint: FileCheckpoint | SQLiteCheckpoint | None
+    ) -> int:
+        emitted += len(page.data)
+        if checkpoint is not None:
+            if page.next is None:
+                checkpoint.clear()
             else:
-                next_page = 0
+                checkpoint.save(CheckpointState(first_page, page.next, emitted))
+        return emitted
+
+    def iter_pages(
+            self,
+            endpoint: str,
+            params: dict | None = None,
+            checkpoint: FileCheckpoint | SQLiteCheckpoint | None = None
+    ) -> Iterator[Page]:
+        """
+        Lazily walks a paginated endpoint, yielding one Page at a time.
+        Only the current page is held in memory.
+        :param endpoint: Path or full URL of the first page
+        :param params: Query parameters for the first page, the next links are expected to carry them on
+        :param checkpoint: Saves the next link after each page is consumed, so a crawl that stopped part way
+            resumes there when started again with the same endpoint and checkpoint
+        :return: Iterator of Page tuples with data, links, meta and included
+        """
+        first_page = add_params(endpoint, params)
+        next_page, emitted = self._resume(first_page, checkpoint)
+
+        while next_page is not None:
+            page = Page.from_document(self.get_json(next_page))
+            next_page = page.next
 
-            time.sleep(0.5)
+            yield page
 
-        return output
+            emitted = self._save_checkpoint(first_page, page, emitted, checkpoint)
+
+    def iter_paginated(
+            self,
+            endpoint: str,
+            params: dict | None = None,
+            checkpoint: FileCheckpoint | SQLiteCheckpoint | None = None
+    ) -> Iterator[dict]:
+        for page in self.iter_pages(endpoint, params, checkpoint):
+            yield from page.data
+
+    def get_paginated(self, endpoint: str, params: dict | None = None) -> list:
+        return list(self.iter_paginated(endpoint, params))
 
 
 class TokenSession(requests.Session):
@@ -88,11 +337,64 @@ class TokenSession(requests.Session):
     """
     A Requests session with some custom headers made specifically for the Client class in MsConnection.py
     Requires an API token from auth.mystore.no and User-Agent.
+    Every Requestor built on the session shares its rate_limiter, retry_policy, cache and single_flight,
+    pass requests_per_second=None to disable rate limiting and retry_policy=False to disable retries.
+    single_flight collapses identical GETs sent from several threads at the same time into one request,
+    pass single_flight=False to send each of them.
+    Request bodies are only compressed when a Compression is given, responses are always negotiated with
+    Accept-Encoding. transfer_stats counts the bytes on the wire and before compression per endpoint.
+    GET responses are only cached when a ResponseCache is given. Bodies are encoded and decoded with codec,
+    which defaults to orjson when it is installed.
+
+    Connections are pooled per host: pool_connections is the number of hosts kept, pool_maxsize the connections
+    kept per host. Set pool_maxsize to at least the number of threads using the session, with pool_block
+    threads wait for a free connection instead of opening (and later discarding) extra ones.
+    timeout is (connect, read) seconds, applied when a request does not set its own.
+
+    One TokenSession may be shared by all threads working for one Client, as long as its headers and
+    adapters are not changed while requests are in flight. The connection pool, rate limiter, retry policy,
+    cache and single flight are thread safe, and Requestor copies the headers for every request.
     """
 
-    def __init__(self, token: str, agent: str):
+    def __init__(
+            self,
+            token: str,
+            agent: str,
+            requests_per_second: float | None = 5.0,
+            burst: int | None = None,
+            retry_policy: RetryPolicy | bool | None = None,
+            cache: ResponseCache | None = None,
+            codec: JsonCodec | None = None,
+            single_flight: SingleFlight | bool | None = None,
+            compression: Compression | None = None,
+            pool_connections: int = 10,
+            pool_maxsize: int = 10,
+            pool_block: bool = True,
+            timeout: float | tuple[float, float] | None = (10.0, 60.0),
+            keep_alive: bool = True
+    ):
         super().__init__()
+        self.cache = cache
+        self.codec = codec if codec is not None else default_codec
+        self.rate_limiter = RateLimiter(requests_per_second, burst) if requests_per_second else None
+        self.retry_policy = RetryPolicy() if retry_policy is None or retry_policy is True else retry_policy or None
+        self.single_flight = SingleFlight() if single_flight is None or single_flight is True else single_flight or None
+        self.compression = compression
+        self.transfer_stats = TransferStats()
+        self.timeout = timeout
         self.headers['User-Agent'] = agent
         self.headers['Content-Type'] = 'application/vnd.api+json'
         self.headers['Accept'] = 'application/vnd.api+json'
         self.headers['Authorization'] = f"Bearer {token}"
+        if not keep_alive:
+            self.headers['Connection'] = 'close'
+
+        # Retries are handled by retry_policy in Requestor, not by urllib3
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().request(method, url, *args, **kwargs)
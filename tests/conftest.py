@@ -0,0 +1,329 @@
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import ssl
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The repository root is the MsConnection package, load it under that name when it is not installed.
+# From the root itself, MsConnection resolves to the MsConnection.py module instead of the package.
+installed = importlib.util.find_spec("MsConnection")
+if installed is None or installed.submodule_search_locations is None:
+    spec = importlib.util.spec_from_file_location(
+        "MsConnection", os.path.join(ROOT, "__init__.py"), submodule_search_locations=[ROOT]
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["MsConnection"] = module
+    spec.loader.exec_module(module)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    """
+    Answers every GET with a one-item JSON:API document echoing the path and Authorization header.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        item = {
+            "type": "products",
+            "id": urlparse(self.path).path.rstrip("/").split("/")[-1],
+            "attributes": {"path": self.path, "authorization": self.headers.get("Authorization")},
+        }
+        body = json.dumps({"data": item}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.api+json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class HTTPSStub(ThreadingHTTPServer):
+
+    """
+    Local HTTPS server counting TLS handshakes, one per accepted connection.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, context: ssl.SSLContext):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.context = context
+        self.handshakes = 0
+        self._lock = threading.Lock()
+
+    def get_request(self):
+        sock, address = super().get_request()
+        with self._lock:
+            self.handshakes += 1
+        return self.context.wrap_socket(sock, server_side=True), address
+
+    @property
+    def url(self) -> str:
+        return f"https://127.0.0.1:{self.server_port}/shops/test/"
+
+
+def _matches(item: dict, path: str, operator: str, values: list[str]) -> bool:
+    if path == "id":
+        value = item["id"]
+    elif "." in path:
+        relationship, key = path.split(".", 1)
+        value = (item.get("relationships", {}).get(relationship, {}).get("data") or {}).get(key)
+    else:
+        value = item.get("attributes", {}).get(path)
+    value = None if value is None else str(value)
+    if operator == "IN":
+        return value in values
+    if value is None:
+        return False
+    if operator == ">=":
+        return value >= values[0]
+    if operator == ">":
+        return value > values[0]
+    return value == values[0]
+
+
+class APIHandler(BaseHTTPRequestHandler):
+
+    """
+    JSON:API over plain HTTP for the resources of an APIStub.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, document: dict | None = None, headers: dict | None = None):
+        body = b"" if document is None else json.dumps(document).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/vnd.api+json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _record(self) -> bytes:
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.server.requests.append((self.command, self.path, dict(self.headers), body))
+        return body
+
+    def _filters(self, query: dict) -> list[tuple[str, str, list[str]]]:
+        filters = dict()
+        for key, values in query.items():
+            if key.startswith("filter["):
+                name, rest = key[len("filter["):].split("]", 1)
+                filters.setdefault(name, dict())[rest] = values[0]
+        return [
+            (
+                condition["[path]"],
+                condition.get("[operator]", "="),
+                [value for key, value in sorted(condition.items()) if key.startswith("[value]")],
+            )
+            for condition in filters.values()
+        ]
+
+    def _collection(self, resource: str, query: dict) -> dict:
+        items = self.server.resources.get(resource, [])
+        for path, operator, values in self._filters(query):
+            if path != "id" or self.server.filter_ids:
+                items = [item for item in items if _matches(item, path, operator, values)]
+
+        number = int(query.get("page[number]", ["1"])[0])
+        page_size = self.server.page_size
+        data = items[(number - 1) * page_size:number * page_size]
+
+        links = dict()
+        if number * page_size < len(items):
+            params = "&".join(f"{key}={value[0]}" for key, value in query.items() if key != "page[number]")
+            links["next"] = f"{self.server.url}{resource}?{params}&page[number]={number + 1}"
+
+        document = {"data": data, "links": links, "meta": {"pagination": {"total": len(items)}}}
+        if "include" in query:
+            document["included"] = self._included(data, query["include"][0].split(","))
+        return document
+
+    def _related(self, item: dict, relationship: str) -> list[dict]:
+        linkage = item.get("relationships", {}).get(relationship, {}).get("data")
+        identifiers = linkage if isinstance(linkage, list) else ([] if linkage is None else [linkage])
+        by_id = {
+            (related["type"], related["id"]): related
+            for items in self.server.resources.values() for related in items
+        }
+        return [by_id[(identifier["type"], identifier["id"])] for identifier in identifiers]
+
+    def _included(self, data: list[dict], relationships: list[str]) -> list[dict]:
+        included = {}
+        for item in data:
+            for relationship in relationships:
+                for related in self._related(item, relationship):
+                    included[(related["type"], related["id"])] = related
+        return list(included.values())
+
+    def do_GET(self):
+        self._record()
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = url.path.strip("/").split("/")[2:]
+
+        items = {item["id"]: item for item in self.server.resources.get(parts[0], [])}
+        if len(parts) == 1:
+            document = self._collection(parts[0], query)
+        elif parts[1] in items and len(parts) == 2:
+            document = {"data": items[parts[1]]}
+        elif parts[1] in items and len(parts) == 3:
+            document = {"data": self._related(items[parts[1]], parts[2]), "links": {}}
+        else:
+            return self._send(404, {"errors": [{"status": "404"}]})
+
+        etag = f'"{hashlib.sha256(json.dumps(document).encode()).hexdigest()[:16]}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, headers={"ETag": etag})
+        self._send(200, document, {"ETag": etag})
+
+    def _apply(self, method: str, path: str, document: dict | None) -> tuple[int, dict | None]:
+        """
+        Applies one write to resources.
+        :return: Status and response document
+        """
+        parts = urlparse(path).path.strip("/").split("/")
+        parts = parts[2:] if parts[0] == "shops" else parts
+        items = self.server.resources.setdefault(parts[0], [])
+        data = document.get("data") if isinstance(document, dict) else None
+
+        if method == "POST" and len(parts) == 1:
+            if not isinstance(data, dict):
+                return 201, {"data": {"type": parts[0], "id": self.server.new_id()}}
+            item = {"relationships": {}, **data, "id": self.server.new_id()}
+            items.append(item)
+            return 201, {"data": item}
+
+        item = next((item for item in items if len(parts) == 2 and item["id"] == parts[1]), None)
+        if item is None:
+            return 404, {"errors": [{"status": "404"}]}
+        if method == "DELETE":
+            items.remove(item)
+            return 204, None
+
+        item.setdefault("attributes", {}).update((data or {}).get("attributes", {}))
+        return 200, {"data": item}
+
+    def _write(self):
+        body = self._record()
+        document = json.loads(body) if body.startswith(b"{") else None
+
+        if urlparse(self.path).path.endswith("-batch"):
+            if self.server.batch_unavailable:
+                return self._send(404, {"errors": [{"status": "404"}]})
+            results = self.server.batch_results
+            if results is None:
+                results = []
+                for operation in document["operations"]:
+                    status, response = self._apply(operation["method"], operation["url"], operation.get("body"))
+                    results.append({"status": status} if response is None else {"status": status, "body": response})
+            return self._send(200, {"results": results})
+
+        self._send(*self._apply(self.command, self.path, document))
+
+    do_POST = do_PATCH = do_DELETE = _write
+
+
+class APIStub(ThreadingHTTPServer):
+
+    """
+    Local JSON:API server. resources maps collection paths to their items, served page_size per page.
+    Filters with the =, >, >= and IN operators are applied, filters on id only when filter_ids is set,
+    and a path like product.id filters on a relationship. Writes change resources: POST appends an item with
+    a new id, PATCH merges attributes and DELETE removes the item. The batch endpoints apply every operation,
+    answer with batch_results instead when it is set, or with 404 when batch_unavailable is set.
+    Every request is recorded in requests as (method, path, headers, body).
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), APIHandler)
+        self.resources: dict[str, list[dict]] = dict()
+        self.page_size = 2
+        self.filter_ids = True
+        self.batch_unavailable = False
+        self.batch_results: list | None = None
+        self.requests = []
+        self._ids = iter(range(1000, 1_000_000))
+
+    def new_id(self) -> str:
+        return str(next(self._ids))
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}/shops/test/"
+
+    def paths(self, method: str = "GET") -> list[str]:
+        return [path for request_method, path, _, _ in self.requests if request_method == method]
+
+
+@pytest.fixture
+def api_server():
+    server = APIStub()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(api_server):
+    from MsConnection import Client, TokenSession
+
+    session = TokenSession("token", "tests", requests_per_second=None)
+    session.trust_env = False
+    client = Client(session, "test")
+    client._r.base_url = api_server.url
+    return client
+
+
+@pytest.fixture(scope="session")
+def certificate(tmp_path_factory):
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl is needed to create the stub server certificate")
+
+    directory = tmp_path_factory.mktemp("tls")
+    cert, key = str(directory / "cert.pem"), str(directory / "key.pem")
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+            "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+            "-keyout", key, "-out", cert,
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+@pytest.fixture
+def https_server(certificate):
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(*certificate)
+
+    server = HTTPSStub(context)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
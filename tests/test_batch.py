@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+import pytest
+
+from MsConnection import TokenSession
+
+
+def product(item_id: int) -> dict:
+    return {"data": {"type": "products", "id": str(item_id), "attributes": {"sku": f"S{item_id}"}}}
+
+
+@pytest.fixture(autouse=True)
+def products(api_server):
+    api_server.resources["products"] = [product(item_id)["data"] for item_id in range(10)]
+
+
+def test_non_atomic_send_is_chunked(client, api_server):
+    builder = client.batch.builder(max_operations=2)
+    for item_id in range(5):
+        builder.update(client.products, item_id, product(item_id), key=item_id)
+
+    results = builder.send()
+
+    assert [result.key for result in results] == [0, 1, 2, 3, 4]
+    assert all(result.ok for result in results)
+    assert api_server.paths("POST") == ["/shops/test/non-atomic-batch"] * 3
+    assert len(builder) == 0
+
+
+def test_atomic_send_must_fit_in_one_request(client, api_server):
+    builder = client.batch.builder(max_operations=2)
+    for item_id in range(3):
+        builder.update(client.products, item_id, product(item_id))
+
+    with pytest.raises(ValueError):
+        builder.send(atomic=True)
+    assert len(builder) == 3
+    assert api_server.requests == []
+
+    builder.max_operations = 3
+    results = builder.send(atomic=True)
+
+    assert all(result.ok for result in results)
+    assert api_server.paths("POST") == ["/shops/test/atomic-batch"]
+    assert len(json.loads(api_server.requests[0][3])["operations"]) == 3
+
+
+def test_results_need_a_success_status(client, api_server):
+    api_server.batch_results = [{"status": 200, "body": {}}, {"body": {"errors": []}}]
+    builder = client.batch.builder()
+    for item_id in range(3):
+        builder.delete(client.products, item_id)
+
+    results = builder.send()
+
+    assert [result.ok for result in results] == [True, False, False]
+
+
+def test_bulk_falls_back_when_batch_is_unavailable(client, api_server):
+    api_server.batch_unavailable = True
+
+    report = client.products.update_many({1: product(1), 2: product(2)})
+
+    assert len(report.succeeded) == 2
+    assert sorted(api_server.paths("PATCH")) == ["/shops/test/products/1", "/shops/test/products/2"]
+
+
+def test_async_batch(api_server):
+    pytest.importorskip("aiohttp")
+    from MsConnection import AsyncClient
+
+    async def run():
+        session = TokenSession("token", "tests", requests_per_second=None)
+        async with AsyncClient(session, "test") as client:
+            client._r.base_url = api_server.url
+
+            builder = client.batch.builder(max_operations=2)
+            for item_id in range(3):
+                builder.update(client.products, item_id, product(item_id))
+            with pytest.raises(ValueError):
+                await builder.send(atomic=True)
+            chunked = await builder.send()
+
+            builder.update(client.products, 9, product(9))
+            atomic = await builder.send(atomic=True)
+
+            api_server.batch_unavailable = True
+            report = await client.products.delete_many([4, 5])
+        return chunked, atomic, report
+
+    chunked, atomic, report = asyncio.run(run())
+
+    assert [result.ok for result in chunked] == [True, True, True]
+    assert [result.ok for result in atomic] == [True]
+    assert len(report.succeeded) == 2
+    assert api_server.paths("POST").count("/shops/test/non-atomic-batch") == 3
+    assert api_server.paths("POST").count("/shops/test/atomic-batch") == 1
+    assert sorted(api_server.paths("DELETE")) == ["/shops/test/products/4", "/shops/test/products/5"]
@@ -0,0 +1,47 @@
+import pytest
+
+from MsConnection import Client, TokenSession
+from MsConnection.cache import MemoryBackend, ResponseCache, SQLiteBackend
+
+
+@pytest.fixture(autouse=True)
+def products(api_server):
+    api_server.resources["products"] = [{"type": "products", "id": "1", "attributes": {"sku": "A"}}]
+
+
+def make_client(api_server, cache: ResponseCache) -> Client:
+    session = TokenSession("token", "tests", requests_per_second=None, cache=cache)
+    session.trust_env = False
+    client = Client(session, "test")
+    client._r.base_url = api_server.url
+    return client
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_etag_revalidation(api_server, tmp_path, backend):
+    cache = ResponseCache(MemoryBackend() if backend == "memory" else SQLiteBackend(str(tmp_path / "cache.db")))
+    client = make_client(api_server, cache)
+
+    assert client.products.get(1)["attributes"]["sku"] == "A"
+    assert client.products.get(1)["attributes"]["sku"] == "A"
+
+    first, second = [headers for method, _, headers, _ in api_server.requests if method == "GET"]
+    assert "If-None-Match" not in first
+    assert "If-None-Match" in second
+    assert cache.revalidations == 1
+
+    client.products.update(1, {"data": {"type": "products", "id": "1", "attributes": {"sku": "B"}}})
+    assert client.products.get(1)["attributes"]["sku"] == "B"
+    assert "If-None-Match" not in api_server.requests[-1][2]
+
+
+def test_fresh_entries_are_served_without_requests(api_server):
+    cache = ResponseCache(default_ttl=60)
+    client = make_client(api_server, cache)
+
+    client.products.get(1)
+    client.products.get(1)
+
+    assert len(api_server.paths()) == 1
+    assert cache.hits == 1 and cache.misses == 1
+
@@ -0,0 +1,64 @@
+from decimal import Decimal
+
+from MsConnection.catalog_sync import CatalogSync, _same, diff_attributes, diff_tags
+
+
+def tag(tag_id: int, product_id: int, key: str, value: str) -> dict:
+    return {
+        "type": "product-tags",
+        "id": str(tag_id),
+        "attributes": {"key": key, "value": value},
+        "relationships": {"product": {"data": {"type": "products", "id": str(product_id)}}}
+    }
+
+
+def test_same_compares_numbers_only_when_desired_is_a_number():
+    assert _same("10.00", 10)
+    assert _same("19.9", Decimal("19.90"))
+    assert not _same("001", "1")
+    assert not _same("1", True)
+    assert not _same(None, 0)
+
+
+def test_diff_attributes_merges_localized_attributes():
+    current = {"name": {"nl": "Stoel", "en": "Chair"}, "price": "10.00", "sku": "001"}
+
+    assert diff_attributes(current, {"name": "Stoel", "price": 10, "sku": "001"}, "nl", ["name"]) == {}
+    assert diff_attributes(current, {"name": {"de": "Stuhl"}, "sku": None}, "nl", ["name"]) == {
+        "name": {"nl": "Stoel", "en": "Chair", "de": "Stuhl"}
+    }
+    assert diff_attributes(current, {"name": "Kruk", "sku": "1"}, "nl", ["name"]) == {
+        "name": {"nl": "Kruk", "en": "Chair"}, "sku": "1"
+    }
+
+
+def test_diff_tags_replaces_changed_values():
+    current = {"1": ("color", "red"), "2": ("size", "L"), "3": ("size", "L")}
+
+    assert diff_tags(current, {"color": "blue", "size": "L"}) == ([("color", "blue")], ["1", "3"])
+
+
+def test_sync_tags(client, api_server, tmp_path):
+    api_server.resources["products"] = [{"type": "products", "id": str(i), "attributes": {}} for i in (1, 2)]
+    api_server.resources["product-tags"] = [
+        tag(10, 1, "color", "red"), tag(11, 1, "size", "L"), tag(12, 2, "color", "red"), tag(13, 3, "color", "red")
+    ]
+    snapshot_path = str(tmp_path / "snapshot.json")
+    desired = {1: {"color": "blue", "size": "L"}, 2: {"color": "red"}}
+
+    sync = CatalogSync(client, "nl", snapshot_path)
+    report = sync.sync("product_tags", desired, dry_run=True)
+    assert report.changed == {("product_tags", "1"): {"create": [("color", "blue")], "delete": [("color", "red")]}}
+    assert api_server.paths("POST") == []
+
+    report = sync.sync("product_tags", desired)
+    assert report.unchanged == 1 and report.updated == 1 and not report.failed
+
+    tags = {(item["relationships"]["product"]["data"]["id"], item["attributes"]["key"], item["attributes"]["value"])
+            for item in api_server.resources["product-tags"]}
+    assert tags == {("1", "color", "blue"), ("1", "size", "L"), ("2", "color", "red"), ("3", "color", "red")}
+
+    requests = len(api_server.requests)
+    report = CatalogSync(client, "nl", snapshot_path).sync("product_tags", desired, use_snapshot=True)
+    assert report.unchanged == 2 and not report.changed
+    assert len(api_server.requests) == requests
@@ -0,0 +1,68 @@
+import pytest
+
+from MsConnection.lookup import LookupEntry, LookupIndex
+
+
+def product(item_id: int, sku: str, updated_at: str) -> dict:
+    return {"type": "products", "id": str(item_id), "attributes": {"sku": sku, "ean": None, "updated_at": updated_at}}
+
+
+@pytest.fixture(autouse=True)
+def products(api_server):
+    api_server.resources["products"] = [
+        product(1, "A", "2024-01-01 10:00:00"),
+        product(2, "B", "2024-01-01 10:00:01"),
+        product(3, "C", "2024-01-01 10:00:02"),
+    ]
+    api_server.resources["product-variants"] = [
+        {"type": "product-variants", "id": "7", "attributes": {"model": "M7", "updated_at": "2024-01-01 09:00:00"}}
+    ]
+
+
+def test_refresh_and_persistence(client, api_server, tmp_path):
+    path = str(tmp_path / "lookup.db")
+    index = LookupIndex(client, path)
+
+    assert index.refresh() == 4
+    assert index.sku("B") == LookupEntry("products", "2")
+    assert index.find("M7") == LookupEntry("product-variants", "7")
+    assert index.high_water("products") == "2024-01-01 10:00:02"
+    index.close()
+
+    requests = len(api_server.requests)
+    index = LookupIndex(client, path)
+    assert len(index) == 4 and index.sku("C") == LookupEntry("products", "3")
+    assert len(api_server.requests) == requests
+
+    # Incremental: only items at or after the high-water mark are requested
+    api_server.resources["products"][0]["attributes"].update(sku="A2", updated_at="2024-01-02 00:00:00")
+    requests = len(api_server.requests)
+    assert index.refresh() == 3
+    crawled = [path for _, path, _, _ in api_server.requests[requests:] if path.startswith("/shops/test/products?")]
+    assert len(crawled) == 1 and "%3E%3D" in crawled[0]
+    assert index.sku("A") is None and index.sku("A2") == LookupEntry("products", "1")
+
+    # Deleted outside the client: kept by an incremental refresh, dropped by a full one
+    del api_server.resources["products"][1]
+    index.refresh()
+    assert index.sku("B") is not None
+    index.refresh(full=True)
+    assert index.sku("B") is None and len(index) == 3
+    index.close()
+
+
+def test_writes_through_the_client(client, tmp_path):
+    index = LookupIndex(client, str(tmp_path / "lookup.db"))
+    index.refresh()
+
+    client.products.update(2, {"data": {"type": "products", "id": "2", "attributes": {"sku": "B2"}}})
+    assert index.sku("B") is None and index.sku("B2") == LookupEntry("products", "2")
+
+    client.products.delete(3)
+    assert index.sku("C") is None
+
+    builder = client.batch.builder()
+    builder.update(client.products, 1, {"data": {"type": "products", "id": "1", "attributes": {"sku": "A3"}}})
+    builder.send()
+    assert index.sku("A3") == LookupEntry("products", "1")
+    index.close()
@@ -0,0 +1,36 @@
+from MsConnection.mirror import Mirror
+
+
+def product(item_id: int, price: str, updated_at: str) -> dict:
+    return {"type": "products", "id": str(item_id), "attributes": {"price": price, "updated_at": updated_at}}
+
+
+def test_sync_and_query(client, api_server, tmp_path):
+    api_server.resources["products"] = [
+        product(1, "10.00", "2024-01-01 10:00:00"),
+        product(2, "25.00", "2024-01-01 10:00:01"),
+        product(3, "5.00", "2024-01-01 10:00:01"),
+    ]
+    mirror = Mirror(client, str(tmp_path / "mirror.db"), {"products": "updated_at"})
+
+    assert mirror.sync("products") == 3
+    assert mirror.get("products", 2)["attributes"]["price"] == "25.00"
+    assert mirror.get("products", 4) is None
+    assert mirror.query(
+        "SELECT id FROM resources WHERE resource = ? AND CAST(json_extract(document, '$.attributes.price') AS REAL) > ?"
+        " ORDER BY id",
+        ("products", 8)
+    ) == [("1",), ("2",)]
+
+    # Incremental: items at the high-water mark are requested and written again
+    api_server.resources["products"][0]["attributes"].update(price="12.00", updated_at="2024-01-02 00:00:00")
+    assert mirror.sync("products") == 3
+    assert mirror.get("products", 1)["attributes"]["price"] == "12.00"
+    assert mirror.high_water("products") == "2024-01-02 00:00:00"
+
+    del api_server.resources["products"][2]
+    assert mirror.sync_all() == {"products": 1}
+    assert sorted(item["id"] for item in mirror.all("products")) == ["1", "2", "3"]
+    assert mirror.sync("products", full=True) == 2
+    assert sorted(item["id"] for item in mirror.all("products")) == ["1", "2"]
+    mirror.close()
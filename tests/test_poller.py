@@ -0,0 +1,80 @@
+import json
+import os
+
+from MsConnection.poller import DeltaPoller
+from MsConnection.session import Page
+
+
+class FakeResource:
+
+    """
+    Serves items in pages of two, ignoring the query, like a server that sends items at the high-water mark again.
+    """
+
+    def __init__(self, items: list[dict]):
+        self.items = items
+        self.queries = []
+
+    def iter_pages(self, query=None):
+        self.queries.append(None if query is None else query.params())
+        items = list(self.items)
+        for i in range(0, len(items), 2):
+            yield Page(items[i:i + 2], {}, {})
+
+
+def item(item_id: str, date: str) -> dict:
+    return {"type": "orders", "id": item_id, "attributes": {"updated_at": date}}
+
+
+def ids(items) -> list[str]:
+    return [item["id"] for item in items]
+
+
+def test_early_break_does_not_deliver_items_again(tmp_path):
+    resource = FakeResource([item(str(i), f"2024-01-01 10:00:0{i}") for i in range(5)])
+    poller = DeltaPoller(resource, str(tmp_path / "state.json"))
+
+    consumed = []
+    for polled in poller.poll():
+        consumed.append(polled["id"])
+        if len(consumed) == 2:
+            break
+
+    assert consumed == ["0", "1"]
+    assert ids(poller.poll()) == ["2", "3", "4"]
+    assert ids(poller.poll()) == []
+
+
+def test_unfinished_poll_is_journaled_not_rewritten(tmp_path):
+    state_path = str(tmp_path / "state.json")
+    resource = FakeResource([item(str(i), "2024-01-01 10:00:00") for i in range(5)])
+    poller = DeltaPoller(resource, state_path)
+
+    polling = poller.poll()
+    next(polling)
+    next(polling)
+    next(polling)
+    polling.close()
+
+    assert not os.path.exists(state_path)
+    with open(poller.journal_path) as file:
+        assert [json.loads(line)[0] for line in file] == ["0", "1", "2"]
+
+    assert ids(poller.poll()) == ["3", "4"]
+    assert not os.path.exists(poller.journal_path)
+
+
+def test_items_at_high_water_mark(tmp_path):
+    resource = FakeResource([item("1", "2024-01-01 10:00:00"), item("2", "2024-01-01 10:00:01")])
+    poller = DeltaPoller(resource, str(tmp_path / "state.json"))
+
+    assert ids(poller.poll()) == ["1", "2"]
+
+    resource.items.append(item("3", "2024-01-01 10:00:01"))
+    assert ids(poller.poll()) == ["3"]
+    assert resource.queries[-1]["filter[updated_at][operator]"] == ">="
+    assert resource.queries[-1]["filter[updated_at][value]"] == "2024-01-01 10:00:01"
+
+    resource.items.append(item("1", "2024-01-02 00:00:00"))
+    assert ids(poller.poll()) == ["1"]
+    assert ids(poller.poll()) == []
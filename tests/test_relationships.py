@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from MsConnection import TokenSession
+from MsConnection.relationships import AsyncRelationshipFetcher, RelationshipFetcher
+
+
+@pytest.fixture(autouse=True)
+def catalog(api_server):
+    api_server.resources["categories"] = [
+        {"type": "categories", "id": str(i), "attributes": {"name": f"Category {i}"}} for i in range(5)
+    ]
+    api_server.resources["products"] = [
+        {
+            "type": "products",
+            "id": str(i),
+            "attributes": {},
+            "relationships": {"categories": {"data": [{"type": "categories", "id": str(i % 5)}]}}
+        }
+        for i in range(10)
+    ]
+
+
+def category_ids(result: dict) -> dict:
+    return {item_id: [category["id"] for category in related["categories"]] for item_id, related in result.items()}
+
+
+@pytest.mark.parametrize("filter_ids", [True, False])
+def test_fetch(client, api_server, filter_ids):
+    api_server.filter_ids = filter_ids
+    fetcher = RelationshipFetcher(client.products, ["categories"])
+
+    result = fetcher.fetch([3, 7])
+
+    assert category_ids(result) == {"3": ["3"], "7": ["2"]}
+    collection = [path for path in api_server.paths() if path.startswith("/shops/test/products?")]
+    related = sorted(path for path in api_server.paths() if path.endswith("/categories"))
+    if filter_ids:
+        assert len(collection) == 1 and related == []
+        assert fetcher.use_include
+    else:
+        # The first page holds unrequested products, the crawl stops there and falls back per id
+        assert len(collection) == 1
+        assert related == ["/shops/test/products/3/categories", "/shops/test/products/7/categories"]
+        assert not fetcher.use_include
+
+
+def test_async_fetch_ignored_filter(api_server):
+    pytest.importorskip("aiohttp")
+    from MsConnection import AsyncClient
+
+    api_server.filter_ids = False
+
+    async def run():
+        session = TokenSession("token", "tests", requests_per_second=None)
+        async with AsyncClient(session, "test") as client:
+            client._r.base_url = api_server.url
+            return await AsyncRelationshipFetcher(client.products, ["categories"]).fetch([3, 7])
+
+    assert category_ids(asyncio.run(run())) == {"3": ["3"], "7": ["2"]}
+    assert len([path for path in api_server.paths() if path.startswith("/shops/test/products?")]) == 1
@@ -0,0 +1,75 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from MsConnection import Client, TokenSession
+
+
+def make_client(server, certificate, single_flight=False, **kwargs) -> Client:
+    session = TokenSession("token", "tests", requests_per_second=None, single_flight=single_flight, **kwargs)
+    session.verify = certificate[0]
+    session.trust_env = False  # REQUESTS_CA_BUNDLE and proxies from the environment would override verify
+    client = Client(session, "test")
+    client._r.base_url = server.url
+    return client
+
+
+def test_session_shared_across_threads(https_server, certificate, caplog):
+    client = make_client(https_server, certificate, pool_maxsize=8)
+    headers = dict(client._r.session.headers)
+
+    def fetch(i):
+        resource = client.products if i % 2 else client.categories
+        return i, resource.get(i)
+
+    with caplog.at_level(logging.WARNING, logger="urllib3"):
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(fetch, range(400)))
+
+    for i, item in results:
+        assert item["id"] == str(i)
+        assert item["attributes"]["path"].startswith(f"/shops/test/{'products' if i % 2 else 'categories'}/{i}")
+        assert item["attributes"]["authorization"] == "Bearer token"
+
+    assert dict(client._r.session.headers) == headers
+    assert "Connection pool is full" not in caplog.text
+
+
+def test_pooled_connections_are_reused(https_server, certificate):
+    pool_size = 8
+    client = make_client(https_server, certificate, pool_maxsize=pool_size)
+
+    with ThreadPoolExecutor(max_workers=pool_size) as executor:
+        list(executor.map(client.products.get, range(400)))
+
+    assert https_server.handshakes <= pool_size
+
+
+def test_single_flight_across_threads(https_server, certificate, caplog):
+    # single_flight=None is the TokenSession default, identical GETs in flight share one request
+    client = make_client(https_server, certificate, single_flight=None)
+    assert client._r.single_flight is not None
+    headers = dict(client._r.session.headers)
+
+    def fetch(i):
+        return i % 20, client.products.get(i % 20)
+
+    with caplog.at_level(logging.WARNING, logger="urllib3"):
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(fetch, range(400)))
+
+    for item_id, item in results:
+        assert item["id"] == str(item_id)
+        assert item["attributes"]["authorization"] == "Bearer token"
+
+    assert dict(client._r.session.headers) == headers
+    assert https_server.handshakes <= client._r.session.get_adapter(https_server.url)._pool_maxsize
+    assert "Connection pool is full" not in caplog.text
+
+
+def test_keep_alive_disabled_handshakes_per_request(https_server, certificate):
+    client = make_client(https_server, certificate, keep_alive=False)
+
+    for i in range(20):
+        client.products.get(i)
+
+    assert https_server.handshakes == 20
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from MsConnection import TokenSession
+
+
+def write_images(directory) -> None:
+    (directory / "a.jpg").write_bytes(b"same" * 1000)
+    (directory / "b.jpg").write_bytes(b"same" * 1000)
+    (directory / "c.png").write_bytes(b"other")
+    (directory / "notes.txt").write_bytes(b"not an image")
+
+
+def test_upload_directory_skips_duplicates_and_manifest(client, api_server, tmp_path):
+    write_images(tmp_path)
+    manifest = str(tmp_path / "manifest.json")
+
+    report = client.images.upload_directory(str(tmp_path), manifest_path=manifest)
+    assert sorted(report.uploaded + report.skipped) == sorted(str(tmp_path / name) for name in ("a.jpg", "b.jpg", "c.png"))
+    assert len(report.uploaded) == 2 and len(report.skipped) == 1
+    assert len(api_server.paths("POST")) == 2
+
+    report = client.images.upload_directory(str(tmp_path), manifest_path=manifest)
+    assert len(report.skipped) == 3
+    assert len(api_server.paths("POST")) == 2
+
+
+def test_failed_upload_does_not_skip_duplicates(client, tmp_path):
+    write_images(tmp_path)
+    upload_image = client.images.upload_image
+    calls = []
+
+    def flaky(path, file_path):
+        calls.append(file_path)
+        if len(calls) == 1:
+            raise OSError("file vanished")
+        return upload_image(path, file_path)
+
+    client.images.upload_image = flaky
+    report = client.images.upload_directory(str(tmp_path), max_workers=1)
+
+    assert list(report.failed) == [str(tmp_path / "a.jpg")]
+    assert report.uploaded == [str(tmp_path / "b.jpg"), str(tmp_path / "c.png")]
+
+
+def test_async_upload(api_server, tmp_path):
+    pytest.importorskip("aiohttp")
+    from MsConnection import AsyncClient
+
+    write_images(tmp_path)
+
+    async def run():
+        session = TokenSession("token", "tests", requests_per_second=None)
+        async with AsyncClient(session, "test") as client:
+            client._r.base_url = api_server.url
+            response = await client.images.upload_image("images", str(tmp_path / "c.png"))
+            report = await client.images.upload_directory(str(tmp_path))
+        return response, report
+
+    response, report = asyncio.run(run())
+
+    assert response.status_code == 201
+    assert len(report.uploaded) == 2 and len(report.skipped) == 1 and not report.failed
+
+    method, path, headers, body = api_server.requests[0]
+    assert headers["Content-Type"].startswith("multipart/form-data; boundary=")
+    assert int(headers["Content-Length"]) == len(body)
+    assert b'filename="c.png"' in body and b"other" in body
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Iterator
+
+from . import utils
+from .MsExceptions import MsExceptions
+
+if TYPE_CHECKING:
+    from .MsConnection import Images
+    from .async_client import AsyncImages
+
+
+IMAGE_MIMES = {
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "gif": "image/gif",
+    "webp": "image/webp"
+}
+
+
+def image_mime(file_path: str) -> str:
+    file_type = file_path.split('.')[-1].lower()
+
+    if file_type not in IMAGE_MIMES:
+        raise FileNotFoundError(f"File not an image file, filetype: {file_type}")
+
+    return IMAGE_MIMES[file_type]
+
+
+def file_hash(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class MultipartStream:
+
+    """
+    multipart/form-data body with a single file field, read from disk as it is sent.
+    It has a length, so requests sends a Content-Length instead of a chunked body.
+    """
+
+    def __init__(self, field: str, file_path: str, content_type: str, chunk_size: int = 64 * 1024):
+        self.boundary = uuid.uuid4().hex
+        self.chunk_size = chunk_size
+        head = (
+            f"--{self.boundary}\r\n"
+            f"Content-Disposition: form-data; name=\"{field}\"; filename=\"{os.path.basename(file_path)}\"\r\n"
+            f"Content-Type: {content_type}\r\n"
+            "\r\n"
+        ).encode()
+        tail = f"\r\n--{self.boundary}--\r\n".encode()
+        self._file = open(file_path, 'rb')
+        self._length = len(head) + os.path.getsize(file_path) + len(tail)
+        self._parts = [io.BytesIO(head), self._file, io.BytesIO(tail)]
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        output = bytearray()
+
+        while self._parts and (size < 0 or len(output) < size):
+            chunk = self._parts[0].read(-1 if size < 0 else size - len(output))
+            if not chunk:
+                self._parts.pop(0)
+            output += chunk
+
+        return bytes(output)
+
+    def __iter__(self) -> Iterator[bytes]:
+        while chunk := self.read(self.chunk_size):
+            yield chunk
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class UploadManifest:
+
+    """
+    JSON file mapping the sha256 of every uploaded file to the server's response,
+    so files with the same content are not uploaded twice.
+    """
+
+    def __init__(self, path: str | None):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries = dict()
+
+        if path is not None and os.path.exists(path):
+            with open(path) as file:
+                self.entries = json.load(file)
+
+    def __contains__(self, digest: str):
+        return digest in self.entries
+
+    def add(self, digest: str, file_path: str, response):
+        with self._lock:
+            self.entries[digest] = {"file": file_path, "response": response}
+
+    def save(self):
+        if self.path is None:
+            return
+
+        with self._lock:
+            utils.write_json_atomic(self.path, self.entries)
+
+
+class UploadReport:
+    def __init__(self):
+        self.uploaded: list[str] = []
+        self.skipped: list[str] = []
+        self.failed: dict[str, Exception] = dict()
+        self.bytes = 0
+        self.seconds = 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        return len(self.uploaded) / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return (
+            f"UploadReport(uploaded={len(self.uploaded)}, skipped={len(self.skipped)}, failed={len(self.failed)}, "
+            f"{self.files_per_second:.1f} files/s, {self.bytes_per_second / 1_000_000:.2f} MB/s)"
+        )
+
+
+def image_files(directory: str, recursive: bool = False) -> list[str]:
+    if recursive:
+        files = [os.path.join(root, name) for root, _, names in os.walk(directory) for name in sorted(names)]
+    else:
+        files = [os.path.join(directory, name) for name in sorted(os.listdir(directory))]
+    return [file for file in files if os.path.isfile(file) and file.split('.')[-1].lower() in IMAGE_MIMES]
+
+
+def upload_directory(
+        images: Images,
+        directory: str,
+        path: str = "images",
+        manifest_path: str | None = None,
+        max_workers: int = 4,
+        recursive: bool = False
+) -> UploadReport:
+    """
+    Uploads every image file in a directory concurrently, skipping content already in the manifest.
+    The manifest is saved when the run ends, also when it is interrupted.
+    """
+    files = image_files(directory, recursive)
+    manifest = UploadManifest(manifest_path)
+    report = UploadReport()
+    seen = set()
+    digest_locks: dict[str, threading.Lock] = dict()
+    lock = threading.Lock()
+
+    def upload(file_path: str):
+        try:
+            digest = file_hash(file_path)
+        except OSError as e:
+            with lock:
+                report.failed[file_path] = e
+            return
+
+        with lock:
+            digest_lock = digest_locks.setdefault(digest, threading.Lock())
+
+        # Files with the same content wait for each other, a copy is only skipped once an earlier one was uploaded
+        with digest_lock:
+            with lock:
+                if digest in manifest or digest in seen:
+                    report.skipped.append(file_path)
+                    return
+
+            try:
+                response = images.upload_image(path, file_path)
+                size = os.path.getsize(file_path)
+            except (MsExceptions.ApiError, OSError) as e:
+                with lock:
+                    report.failed[file_path] = e
+                return
+
+            try:
+                body = images._r.decode(response)
+            except ValueError:
+                body = None
+
+            manifest.add(digest, file_path, body)
+            with lock:
+                seen.add(digest)
+                report.uploaded.append(file_path)
+                report.bytes += size
+
+    start = time.monotonic()
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(upload, files))
+    finally:
+        report.seconds = time.monotonic() - start
+        manifest.save()
+
+    return report
+
+
+async def upload_directory_async(
+        images: AsyncImages,
+        directory: str,
+        path: str = "images",
+        manifest_path: str | None = None,
+        max_concurrency: int = 4,
+        recursive: bool = False
+) -> UploadReport:
+    """
+    upload_directory for the images resource of an AsyncClient, with at most max_concurrency uploads in flight.
+    Files are hashed on worker threads, so the event loop is not blocked by disk reads.
+    """
+    files = image_files(directory, recursive)
+    manifest = UploadManifest(manifest_path)
+    report = UploadReport()
+    seen = set()
+    digest_locks: dict[str, asyncio.Lock] = dict()
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def upload(file_path: str):
+        async with semaphore:
+            try:
+                digest = await asyncio.to_thread(file_hash, file_path)
+            except OSError as e:
+                report.failed[file_path] = e
+                return
+
+            # Files with the same content wait for each other, a copy is only skipped once an earlier one was uploaded
+            async with digest_locks.setdefault(digest, asyncio.Lock()):
+                if digest in manifest or digest in seen:
+                    report.skipped.append(file_path)
+                    return
+
+                try:
+                    response = await images.upload_image(path, file_path)
+                    size = os.path.getsize(file_path)
+                except (MsExceptions.ApiError, OSError) as e:
+                    report.failed[file_path] = e
+                    return
+
+                try:
+                    body = images._r.decode(response)
+                except ValueError:
+                    body = None
+
+                manifest.add(digest, file_path, body)
+                seen.add(digest)
+                report.uploaded.append(file_path)
+                report.bytes += size
+
+    start = time.monotonic()
+    try:
+        await asyncio.gather(*(upload(file_path) for file_path in files))
+    finally:
+        report.seconds = time.monotonic() - start
+        manifest.save()
+
+    return report
@@ -1,16 +1,38 @@
 from __future__ import annotations
 
 import json
+import os
 from datetime import datetime, timezone
-from typing import Any, Callable, Dict, List, NamedTuple, Tuple, TypeVar, Union, cast
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, NamedTuple, Tuple, TypeVar, Union, cast
+from urllib.parse import urlencode
 
 import requests
 
-import MsConnection
+from .category_tree import CategoryTree
+from .codec import default_codec
+
+if TYPE_CHECKING:
+    from .MsConnection import Client
 
 
 def format_filter(attribute: str, value: str, operand: str = "=") -> str:
-    return f"?filter[{attribute}][path]={attribute}&filter[{attribute}][value]{operand}{value}"
+    """
+    Query string for one filter, encoded as query.Query does, with operands other than "=" in filter[...][operator].
+    """
+    from .query import Query  # query imports utils
+
+    return f"?{urlencode(Query().filter(attribute, value, operand).params(), safe='[],')}"
+
+
+def write_json_atomic(path: str, obj: Any):
+    """
+    Writes obj as JSON to a temporary file next to path and moves it into place,
+    so a crash during the write never leaves a truncated file at path.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(obj, file)
+    os.replace(tmp_path, path)
 
 
 def not_none(val) -> bool:
@@ -58,7 +80,7 @@ def build_attributes(simple: dict, localized: dict | None, default_language: str
     return attributes
 
 
-def convert_object_to_json_str(object_type: str, attributes: dict, object_id: int | None, relationships: dict | None):
+def convert_object_to_json(object_type: str, attributes: dict, object_id: int | None, relationships: dict | None) -> bytes:
     data = {
         "data": {
             "type": object_type,
@@ -73,56 +95,31 @@ def convert_object_to_json_str(object_type: str, attributes: dict, object_id: in
     if relationships is not None:
         data["data"]["relationships"] = relationships
 
-    return json.dumps(data, indent=2)
-
-
-def all_categories_without_children(categories: dict) -> set:
-    categories_without_children = set()
-    parent_ids = set()
-
-    for category in categories:
-        parent = category['relationships']['parent']['data']
-        if parent is not None:
-            parent_ids.add(parent['id'])
+    return default_codec.dumps(data)
 
-    for category in categories:
-        category_id = category['id']
-        if category_id not in parent_ids:
-            categories_without_children.add(category_id)
-
-    return categories_without_children
 
+def convert_object_to_json_str(object_type: str, attributes: dict, object_id: int | None, relationships: dict | None):
+    return convert_object_to_json(object_type, attributes, object_id, relationships).decode()
 
-def all_categories_without_parents(categories: dict) -> set:
-    categories_without_parents = set()
 
-    for category in categories:
-        parent = category['relationships']['parent']['data']
-        category_id = category['id']
-        if parent is None:
-            categories_without_parents.add(category_id)
+def all_categories_without_children(categories: dict | CategoryTree) -> set:
+    tree = categories if isinstance(categories, CategoryTree) else CategoryTree(categories)
+    return tree.leaves()
 
-    return categories_without_parents
 
+def all_categories_without_parents(categories: dict | CategoryTree) -> set:
+    tree = categories if isinstance(categories, CategoryTree) else CategoryTree(categories)
+    return tree.roots()
 
-def move_all_main_categories_into_common_category(session: MsConnection.Client, categories: dict, main_cat: int | str):
-    movables = [pid for pid in all_categories_without_parents(categories) if pid != str(main_cat)]
 
-    for cat in movables:
-        update = {
-            "data": {
-                "id": cat,
-                "relationships": {
-                    "parent": {
-                        "data": {
-                            "type": "categories",
-                            "id": str(main_cat)
-                        }
-                    }
-                }
-            }
-        }
-        session.categories.update_category(int(cat), json.dumps(update, indent=2))
+def move_all_main_categories_into_common_category(
+        session: Client,
+        categories: dict | CategoryTree,
+        main_cat: int | str
+):
+    tree = categories if isinstance(categories, CategoryTree) else CategoryTree(categories)
+    movables = [pid for pid in tree.roots() if pid != str(main_cat)]
+    return tree.move_many(session, movables, main_cat)
 
 
 def get_mime(file: str):